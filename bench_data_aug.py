@@ -0,0 +1,255 @@
+"""Benchmark the augmentation pipeline of data_aug.py on synthetic pain drawings.
+
+No patient data is needed: every drawing is generated on the fly as a body outline
+with colored pain strokes, at several canvas resolutions. For each resolution the
+benchmark reports images/sec, the time spent in each stage (decode, rotate/zoom,
+recolor, composite, encode) and peak memory, and writes everything to a JSON file
+so runs of different versions can be compared with ``--compare``.
+
+Stages are timed without any memory tracing. Memory is measured in a separate
+pass: a child process per resolution runs the pipeline, and the growth of its
+peak resident set size (VmHWM, or ``ru_maxrss``) is reported, so PIL's image buffers are
+counted too.
+
+    python bench_data_aug.py --output bench_results.json
+    python bench_data_aug.py --compare bench_results.json
+"""
+from PIL import Image, ImageDraw
+import numpy as np
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import PIL
+import data_aug
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Portrait canvases with the aspect ratio of seepain_human_template.png
+RESOLUTIONS = ((600, 800), (1200, 1600), (2400, 3200))
+
+STAGES = ("decode", "rotate_zoom", "recolor", "composite", "encode")
+
+# Pipeline runs of the memory pass
+MEMORY_RUNS = 3
+
+# Pain colors of the drawing screen, from yellow (1) to red (10)
+PAIN_COLORS = [(255, int(255 * (1 - k / 10)), 0) for k in range(10)]
+
+
+def synthetic_drawing(size, seed=0):
+    """Draw a front and a back body outline with random pain strokes on a white canvas."""
+    rng = random.Random(seed)
+    w, h = size
+    image = Image.new("RGB", size, (255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    outline = max(1, w // 300)
+
+    # Front (V) and back (H) views side by side
+    for cx in (w // 4, 3 * w // 4):
+        head = w // 16
+        draw.ellipse((cx - head, h // 20, cx + head, h // 20 + 2 * head), outline=(0, 0, 0), width=outline)
+        draw.rectangle((cx - w // 9, h // 5, cx + w // 9, h // 2), outline=(0, 0, 0), width=outline)
+        draw.rectangle((cx - w // 9 - w // 20, h // 5, cx - w // 9, h // 2), outline=(0, 0, 0), width=outline)
+        draw.rectangle((cx + w // 9, h // 5, cx + w // 9 + w // 20, h // 2), outline=(0, 0, 0), width=outline)
+        draw.rectangle((cx - w // 10, h // 2, cx - w // 80, 19 * h // 20), outline=(0, 0, 0), width=outline)
+        draw.rectangle((cx + w // 80, h // 2, cx + w // 10, 19 * h // 20), outline=(0, 0, 0), width=outline)
+
+    # Pain strokes
+    for _ in range(25):
+        color = rng.choice(PAIN_COLORS)
+        width = rng.randint(1, 10) * max(1, w // 600)
+        x, y = rng.uniform(0, w), rng.uniform(0, h)
+        points = [(x, y)]
+        for _ in range(rng.randint(5, 40)):
+            x = min(max(x + rng.uniform(-w / 40, w / 40), 0), w)
+            y = min(max(y + rng.uniform(-h / 40, h / 40), 0), h)
+            points.append((x, y))
+        draw.line(points, fill=color, width=width, joint="curve")
+    return image
+
+
+def synthetic_background(size):
+    """Return a light gray RGBA background to merge the drawings onto."""
+    return Image.new("RGBA", size, (240, 240, 240, 255))
+
+
+def encode_png(image):
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def run_pipeline(png_bytes, background, params, timings):
+    """Run one drawing through every stage, adding the time of each stage to ``timings``."""
+    t0 = time.perf_counter()
+    source = data_aug.load_source(io.BytesIO(png_bytes))
+    t1 = time.perf_counter()
+    augmented_image = data_aug.augment_image(source, params=params)
+    t2 = time.perf_counter()
+    pixels = data_aug.recolor_alpha_key(augmented_image)
+    t3 = time.perf_counter()
+    merged_image = data_aug.composite_over(pixels, background)
+    t4 = time.perf_counter()
+    encode_png(merged_image)
+    t5 = time.perf_counter()
+
+    for stage, start, end in zip(STAGES, (t0, t1, t2, t3, t4), (t1, t2, t3, t4, t5)):
+        timings[stage].append(end - start)
+    return t5 - t0
+
+
+def bench_resolution(size, repeats, warmup=1):
+    """Benchmark the pipeline on drawings of one resolution."""
+    png_bytes = encode_png(synthetic_drawing(size))
+    background = synthetic_background(size)
+    rng = random.Random(42)
+
+    timings = {stage: [] for stage in STAGES}
+    for _ in range(warmup):
+        run_pipeline(png_bytes, background, data_aug.sample_params(rng), {stage: [] for stage in STAGES})
+
+    totals = [run_pipeline(png_bytes, background, data_aug.sample_params(rng), timings) for _ in range(repeats)]
+    memory = measure_memory(png_bytes, size)
+
+    return {
+        "size": list(size),
+        "repeats": repeats,
+        "images_per_sec": repeats / sum(totals),
+        "total_ms": {"median": 1000 * float(np.median(totals)), "min": 1000 * min(totals)},
+        "stages_ms": {stage: {"median": 1000 * float(np.median(values)), "min": 1000 * min(values)}
+                      for stage, values in timings.items()},
+        # Growth of the peak RSS while running the pipeline, and the peak RSS of that process
+        "peak_mb": memory and memory["peak_mb"],
+        "peak_rss_mb": memory and memory["peak_rss_mb"],
+    }
+
+
+def measure_memory(png_bytes, size):
+    """Run the pipeline in a child process and return its peak memory; None if unavailable."""
+    if resource is None:
+        return None
+    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
+        f.write(png_bytes)
+    try:
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--memory-probe", f.name,
+                                 "--sizes", f"{size[0]}x{size[1]}"],
+                                capture_output=True, text=True, check=True).stdout
+    finally:
+        os.remove(f.name)
+    return json.loads(output.splitlines()[-1])
+
+
+def memory_probe(path, size):
+    """Body of the memory pass: print the peak RSS growth of MEMORY_RUNS pipeline runs as JSON."""
+    with open(path, "rb") as f:
+        png_bytes = f.read()
+    rng = random.Random(42)
+    baseline = peak_rss_mb()
+    for _ in range(MEMORY_RUNS):
+        run_pipeline(png_bytes, synthetic_background(size), data_aug.sample_params(rng),
+                     {stage: [] for stage in STAGES})
+    peak = peak_rss_mb()
+    print(json.dumps({"peak_mb": peak - baseline, "peak_rss_mb": peak}))
+
+
+def peak_rss_mb():
+    """Return the peak resident set size of the process, if the platform reports it."""
+    # On Linux ru_maxrss survives exec, so a child would start at the parent's peak;
+    # VmHWM only covers the current program
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 2 ** 10
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results):
+    header = f"{'size':>11} {'img/s':>8} " + " ".join(f"{stage:>11}" for stage in STAGES) + f" {'peak MB':>8}"
+    print(header)
+    for result in results:
+        w, h = result["size"]
+        stages = " ".join(f"{result['stages_ms'][stage]['median']:>9.1f}ms" for stage in STAGES)
+        peak = f"{result['peak_mb']:>8.1f}" if result["peak_mb"] is not None else f"{'-':>8}"
+        print(f"{f'{w}x{h}':>11} {result['images_per_sec']:>8.2f} {stages} {peak}")
+
+
+def print_comparison(results, baseline):
+    """Print the speed of this run relative to a previous results file."""
+    previous = {tuple(result["size"]): result for result in baseline["results"]}
+    print(f"\nCompared to {baseline.get('revision') or 'baseline'} (>1.00 = faster now):")
+    for result in results:
+        old = previous.get(tuple(result["size"]))
+        if old is None:
+            continue
+        w, h = result["size"]
+        ratios = " ".join(
+            f"{stage}={old['stages_ms'][stage]['median'] / max(result['stages_ms'][stage]['median'], 1e-9):.2f}"
+            for stage in STAGES)
+        speedup = result["images_per_sec"] / old["images_per_sec"]
+        print(f"  {w}x{h}: images/sec x{speedup:.2f} ({ratios})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the data_aug.py augmentation pipeline.")
+    parser.add_argument("--repeats", type=int, default=10, help="augmented images per resolution")
+    parser.add_argument("--sizes", type=data_aug.parse_size, nargs="+", default=list(RESOLUTIONS),
+                        help="canvas sizes as WIDTHxHEIGHT")
+    parser.add_argument("--output", default="bench_results.json", help="JSON file the results are written to")
+    parser.add_argument("--compare", default=None, help="previous results file to compare against")
+    # Internal: run the memory pass of one resolution (see measure_memory)
+    parser.add_argument("--memory-probe", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.memory_probe:
+        memory_probe(args.memory_probe, tuple(args.sizes[0]))
+        return
+
+    results = [bench_resolution(tuple(size), args.repeats) for size in args.sizes]
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pillow": PIL.__version__,
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    print_results(results)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(results, json.load(f))
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=1)
+    print(f"\nResults saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+from PIL import Image
+import argparse
+import json
+import os
+import shutil
+
+# Folder read by pages/assets.py (which imports Kivy, so it is not imported here)
+OUTPUT_FOLDER = "assets"
+
+# Screen density buckets, as Android names them, and their Kivy Metrics.density
+DENSITIES = {"mdpi": 1.0, "hdpi": 1.5, "xhdpi": 2.0, "xxhdpi": 3.0}
+
+# Largest side of an atlas page, in pixels; safe for the GPUs of older tablets
+ATLAS_SIZE = 2048
+
+# Pixels between atlas images, filled with their edge pixels so filtering does not bleed
+PADDING = 2
+
+# Asset groups: source images, the largest side they are shown at (in dp), and whether
+# they go into one atlas. The menu images are the slides of MenuPage.IMAGE_TEXT_DATA.
+ASSET_GROUPS = {
+    "menu": {
+        "images": [
+            "pages/menu_page/pen_tablet.png",
+            "pages/menu_page/pen_thickness.png",
+            "pages/menu_page/pain_value.png",
+            "pages/menu_page/info.png",
+        ],
+        "display_dp": 480,
+        "atlas": True,
+    },
+    "logo": {
+        "images": ["pages/base_page/logo.png"],
+        "display_dp": 256,
+        "atlas": False,
+    },
+    "template": {
+        "images": ["pages/menu_page/seepain_info/seepain_human_template.png"],
+        "display_dp": 1024,
+        "atlas": False,
+    },
+}
+
+
+def scaled(image, max_side):
+    """Downscale an image so its largest side is at most ``max_side``; never upscale."""
+    scale = min(1.0, max_side / max(image.size))
+    if scale == 1.0:
+        return image
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    return image.resize(size, Image.LANCZOS)
+
+
+def pack_shelves(sizes, page_size=ATLAS_SIZE, padding=PADDING):
+    """Place rectangles on atlas pages in rows, tallest first.
+
+    Returns, for every size, its (page, x, y) with y from the top of the page.
+    """
+    order = sorted(range(len(sizes)), key=lambda i: sizes[i][1], reverse=True)
+    places = [None] * len(sizes)
+    page, x, y, row_height = 0, padding, padding, 0
+    for i in order:
+        width, height = sizes[i]
+        if width + 2 * padding > page_size or height + 2 * padding > page_size:
+            raise ValueError(f"image of {width}x{height} does not fit an atlas page of {page_size}")
+        if x + width + padding > page_size:
+            # Next row
+            x, y, row_height = padding, y + row_height + padding, 0
+        if y + height + padding > page_size:
+            # Next page
+            page, x, y, row_height = page + 1, padding, padding, 0
+        places[i] = (page, x, y)
+        x += width + padding
+        row_height = max(row_height, height)
+    return places
+
+
+def build_atlas(images, output_base, page_size=ATLAS_SIZE, padding=PADDING):
+    """Write ``images`` ({id: PIL image}) as a Kivy atlas; returns {id: (page file, [x, y, w, h])}.
+
+    Regions use Kivy's atlas convention, y from the bottom of the page, so the
+    ``.atlas`` file also works with ``atlas://`` urls.
+    """
+    ids = list(images)
+    places = pack_shelves([images[i].size for i in ids], page_size, padding)
+
+    # Pages are only as tall as their images need, rounded up to a power of two
+    heights = [0] * (max(p[0] for p in places) + 1)
+    for image_id, (page, x, y) in zip(ids, places):
+        heights[page] = max(heights[page], y + images[image_id].height + padding)
+    pages = [Image.new("RGBA", (page_size, min(page_size, 1 << (height - 1).bit_length()))) for height in heights]
+
+    meta = {}
+    regions = {}
+    for image_id, (page, x, y) in zip(ids, places):
+        image = images[image_id].convert("RGBA")
+        width, height = image.size
+        out = pages[page]
+        out.paste(image, (x, y))
+        # Repeat the edges into the padding
+        out.paste(image.crop((0, 0, width, 1)), (x, y - 1))
+        out.paste(image.crop((0, height - 1, width, height)), (x, y + height))
+        out.paste(image.crop((0, 0, 1, height)), (x - 1, y))
+        out.paste(image.crop((width - 1, 0, width, height)), (x + width, y))
+
+        page_file = f"{os.path.basename(output_base)}-{page}.png"
+        region = [x, out.height - y - height, width, height]
+        meta.setdefault(page_file, {})[image_id] = region
+        regions[image_id] = (os.path.join(os.path.dirname(output_base), page_file), region)
+
+    for page, out in enumerate(pages):
+        out.save(f"{output_base}-{page}.png", optimize=True)
+    with open(f"{output_base}.atlas", "w") as f:
+        json.dump(meta, f)
+    return regions
+
+
+def build(output_folder=OUTPUT_FOLDER, densities=DENSITIES, groups=ASSET_GROUPS):
+    if os.path.exists(output_folder):
+        shutil.rmtree(output_folder)
+
+    index = {"densities": densities, "images": {}}
+    for bucket, density in densities.items():
+        bucket_folder = os.path.join(output_folder, bucket)
+        os.makedirs(bucket_folder)
+        for group, spec in groups.items():
+            max_side = round(spec["display_dp"] * density)
+            sources = [path for path in spec["images"] if os.path.exists(path)]
+            for path in set(spec["images"]) - set(sources):
+                print(f"Skipping missing image {path}")
+            if not sources:
+                continue
+
+            images = {os.path.splitext(os.path.basename(path))[0]: scaled(Image.open(path), max_side)
+                      for path in sources}
+            if spec["atlas"]:
+                regions = build_atlas(images, os.path.join(bucket_folder, group))
+                for path in sources:
+                    page_file, region = regions[os.path.splitext(os.path.basename(path))[0]]
+                    index["images"].setdefault(path, {})[bucket] = [page_file.replace(os.sep, "/"), region]
+            else:
+                for path in sources:
+                    image_id = os.path.splitext(os.path.basename(path))[0]
+                    variant = os.path.join(bucket_folder, f"{image_id}.png")
+                    images[image_id].save(variant, optimize=True)
+                    index["images"].setdefault(path, {})[bucket] = [variant.replace(os.sep, "/"), None]
+
+        size = sum(os.path.getsize(os.path.join(bucket_folder, f)) for f in os.listdir(bucket_folder))
+        print(f"{bucket}: {len(os.listdir(bucket_folder))} files, {size / 1024:.0f} KB")
+
+    with open(os.path.join(output_folder, "index.json"), "w") as f:
+        json.dump(index, f, indent=2)
+    print(f"Asset index saved to {os.path.join(output_folder, 'index.json')}")
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build atlases and per-density variants of the app images.")
+    parser.add_argument("--output", default=OUTPUT_FOLDER, help="folder the processed assets are written to")
+    parser.add_argument("--densities", default=",".join(DENSITIES),
+                        help="density buckets to build, e.g. hdpi,xhdpi for the devices an APK targets")
+    args = parser.parse_args(argv)
+
+    names = args.densities.split(",")
+    unknown = [name for name in names if name not in DENSITIES]
+    if unknown:
+        parser.error(f"unknown densities: {', '.join(unknown)}")
+    build(args.output, {name: DENSITIES[name] for name in names})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+from PIL import Image, ImageDraw, ImageFilter
+import numpy as np
+import argparse
+import json
+
+from pages.menu_page.seepain_info.body_regions import RegionMap, save_region_map, REGION_MAP_PATH
+
+# Human template the label map is aligned with
+TEMPLATE_PATH = "pages/menu_page/seepain_info/seepain_human_template.png"
+
+# Largest side of the label map; lookups are scaled, so it need not match the template
+MAX_SIZE = 512
+
+# Views of the template from left to right: V (Vorne) and H (Hinten), as in the help popup
+VIEWS = ("V", "H")
+
+# Body bands as fractions of the figure height, from the top: (end, front name, back name)
+BANDS = [
+    (0.13, "Kopf", "Hinterkopf"),
+    (0.18, "Hals", "Nacken"),
+    (0.38, "Brust", "Oberer Rücken"),
+    (0.52, "Bauch", "Unterer Rücken"),
+    (0.60, "Becken", "Gesäß"),
+    (0.78, "Oberschenkel", "Oberschenkel"),
+    (0.95, "Unterschenkel", "Unterschenkel"),
+    (1.00, "Fuß", "Fuß"),
+]
+
+# Half width of the trunk as a fraction of the figure height; wider pixels above the legs are arms
+TRUNK_HALF_WIDTH = 0.09
+
+# Arm pixels below this fraction of the figure height are hands
+HAND_START = 0.45
+
+# Bands from here on are split into left and right legs
+LEGS_START = 0.60
+
+
+def body_mask(template):
+    """Pixels inside the body outlines: everything not reachable from the image border."""
+    rgba = np.asarray(template.convert("RGBA"))
+    outline = (rgba[..., 3] > 0) & (rgba[..., :3].min(axis=-1) < 200)
+    # Close small gaps in the outline so the fill does not leak into the body
+    walls = Image.fromarray((outline * 255).astype(np.uint8)).filter(ImageFilter.MaxFilter(5))
+    filled = walls.convert("L")
+    padded = Image.new("L", (filled.width + 2, filled.height + 2), 0)
+    padded.paste(filled, (1, 1))
+    ImageDraw.floodfill(padded, (0, 0), 128)
+    outside = np.asarray(padded)[1:-1, 1:-1] == 128
+    return ~outside
+
+
+def split_views(mask, count):
+    """Column ranges of the ``count`` widest separate figures, left to right."""
+    columns = mask.any(axis=0)
+    spans = []
+    start = None
+    for x, filled in enumerate(list(columns) + [False]):
+        if filled and start is None:
+            start = x
+        elif not filled and start is not None:
+            spans.append((start, x))
+            start = None
+    spans = sorted(sorted(spans, key=lambda s: s[1] - s[0], reverse=True)[:count])
+    if len(spans) < count:
+        raise ValueError(f"found {len(spans)} figures in the template, expected {count}")
+    return spans
+
+
+def label_proportional(mask, views=VIEWS):
+    """Split every figure into bands by body proportions, arms and legs into left and right."""
+    names = []
+    labels = np.zeros(mask.shape, np.uint8)
+
+    def label_of(name):
+        if name not in names:
+            names.append(name)
+        return names.index(name) + 1
+
+    rows = np.arange(mask.shape[0])[:, None]
+    for view, (x0, x1) in zip(views, split_views(mask, len(views))):
+        figure = np.zeros_like(mask)
+        figure[:, x0:x1] = mask[:, x0:x1]
+        ys, xs = np.nonzero(figure)
+        top, height = ys.min(), ys.max() - ys.min() + 1
+        center = xs.mean()
+        front = view == views[0]
+        frac = (rows - top) / height
+        cols = np.arange(mask.shape[1])[None, :]
+        # Seen from the front the patient's right is on the left of the image, from the back on the right
+        image_left = (cols < center) & figure
+        side_right = image_left if front else (figure & ~image_left)
+
+        start = 0.0
+        for end, front_name, back_name in BANDS:
+            band = figure & (frac >= start) & (frac < end if end < 1 else frac <= end)
+            name = f"{view} {front_name if front else back_name}"
+            if start >= LEGS_START:
+                labels[band & side_right] = label_of(f"{name} R")
+                labels[band & ~side_right] = label_of(f"{name} L")
+            else:
+                labels[band] = label_of(name)
+            start = end
+
+        # Arms: figure pixels above the legs, away from the trunk
+        arms = figure & (frac < LEGS_START) & (np.abs(cols - center) > TRUNK_HALF_WIDTH * height) & (frac > BANDS[1][0])
+        for side, side_mask in (("R", side_right), ("L", ~side_right)):
+            labels[arms & side_mask & (frac < HAND_START)] = label_of(f"{view} Arm {side}")
+            labels[arms & side_mask & (frac >= HAND_START)] = label_of(f"{view} Hand {side}")
+    return labels, names
+
+
+def label_from_mask(mask_path, legend_path, size):
+    """Labels from a hand-painted mask, whose legend maps "#rrggbb" colors to region names."""
+    with open(legend_path, encoding="utf-8") as f:
+        legend = json.load(f)
+    rgb = np.asarray(Image.open(mask_path).convert("RGB").resize(size, Image.NEAREST)).astype(np.uint32)
+    codes = (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+    labels = np.zeros(codes.shape, np.uint8)
+    names = []
+    for color, name in legend.items():
+        names.append(name)
+        labels[codes == int(color.lstrip("#"), 16)] = len(names)
+    return labels, names
+
+
+def build(template_path=TEMPLATE_PATH, output_path=REGION_MAP_PATH, max_size=MAX_SIZE, views=VIEWS,
+          mask_path=None, legend_path=None):
+    template = Image.open(template_path)
+    scale = min(1.0, max_size / max(template.size))
+    size = (max(1, round(template.width * scale)), max(1, round(template.height * scale)))
+    if mask_path:
+        labels, names = label_from_mask(mask_path, legend_path, size)
+    else:
+        labels, names = label_proportional(body_mask(template.resize(size, Image.LANCZOS)), views)
+
+    region_map = RegionMap(size[0], size[1], names, labels.tobytes())
+    save_region_map(output_path, region_map)
+    print(f"Region map with {len(names)} regions saved to {output_path}")
+    for label, name in enumerate(names, 1):
+        print(f"  {label:3d} {name}: {int((labels == label).sum())} px")
+    return region_map
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the body-region label map of the human template.")
+    parser.add_argument("--template", default=TEMPLATE_PATH, help="template image the map is aligned with")
+    parser.add_argument("--output", default=REGION_MAP_PATH, help="region map file to write")
+    parser.add_argument("--max-size", type=int, default=MAX_SIZE, help="largest side of the map, in pixels")
+    parser.add_argument("--views", default=",".join(VIEWS), help="names of the figures from left to right")
+    parser.add_argument("--mask", help="hand-painted region mask to use instead of body proportions")
+    parser.add_argument("--legend", help="JSON mapping the mask's #rrggbb colors to region names")
+    args = parser.parse_args(argv)
+    if args.mask and not args.legend:
+        parser.error("--mask needs --legend")
+
+    build(args.template, args.output, args.max_size, tuple(args.views.split(",")), args.mask, args.legend)
+
+
+if __name__ == "__main__":
+    main()
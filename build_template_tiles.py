@@ -0,0 +1,65 @@
+from PIL import Image
+import argparse
+import json
+import os
+import shutil
+
+# Human template the pyramid is built from
+TEMPLATE_PATH = "pages/menu_page/seepain_info/seepain_human_template.png"
+
+# Folder read by pages/menu_page/seepain_info/template_tiles.py (which imports Kivy, so it is not imported here)
+TILES_PATH = "pages/menu_page/seepain_info/template_tiles"
+
+# Side of a tile, in pixels
+TILE_SIZE = 256
+
+
+def tile_path(path, level, col, row):
+    """Path of a tile, as template_tiles.tile_path."""
+    return os.path.join(path, str(level), f"{col}_{row}.png")
+
+
+def build_levels(image, tile_size=TILE_SIZE):
+    """Return the pyramid levels: the full image, then halved until it fits one tile."""
+    levels = [image]
+    while max(levels[-1].size) > tile_size:
+        width, height = levels[-1].size
+        levels.append(levels[-1].resize((max(1, (width + 1) // 2), max(1, (height + 1) // 2)), Image.LANCZOS))
+    return levels
+
+
+def build(template_path=TEMPLATE_PATH, output_path=TILES_PATH, tile_size=TILE_SIZE):
+    image = Image.open(template_path).convert("RGBA")
+    if os.path.exists(output_path):
+        shutil.rmtree(output_path)
+
+    index = {"width": image.width, "height": image.height, "tile_size": tile_size, "levels": []}
+    for level, level_image in enumerate(build_levels(image, tile_size)):
+        width, height = level_image.size
+        cols, rows = -(-width // tile_size), -(-height // tile_size)
+        os.makedirs(os.path.join(output_path, str(level)))
+        for row in range(rows):
+            for col in range(cols):
+                box = (col * tile_size, row * tile_size,
+                       min(width, (col + 1) * tile_size), min(height, (row + 1) * tile_size))
+                level_image.crop(box).save(tile_path(output_path, level, col, row), optimize=True)
+        index["levels"].append({"width": width, "height": height, "cols": cols, "rows": rows})
+        print(f"Level {level}: {width}x{height}, {cols * rows} tiles")
+
+    with open(os.path.join(output_path, "index.json"), "w") as f:
+        json.dump(index, f, indent=2)
+    print(f"Tile pyramid saved to {output_path}")
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cut the human template into a multi-resolution tile pyramid.")
+    parser.add_argument("--template", default=TEMPLATE_PATH, help="template image to cut")
+    parser.add_argument("--output", default=TILES_PATH, help="folder the tiles and index.json are written to")
+    parser.add_argument("--tile-size", type=int, default=TILE_SIZE, help="side of a tile, in pixels")
+    args = parser.parse_args(argv)
+    build(args.template, args.output, args.tile_size)
+
+
+if __name__ == "__main__":
+    main()
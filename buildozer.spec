@@ -13,7 +13,7 @@ package.domain = org.seepain
 source.dir = .
 
 # (list) Source files to include (let empty to include all the files)
-source.include_exts = py,png,jpg,kv,atlas
+source.include_exts = py,png,jpg,kv,atlas,json,spr
 
 # (list) List of inclusions using pattern matching
 #source.include_patterns = assets/*,images/*.png
@@ -27,6 +27,8 @@ source.include_exts = py,png,jpg,kv,atlas
 # (list) List of exclusions using pattern matching
 # Do not prefix with './'
 #source.exclude_patterns = license,images/*/*.jpg
+# Once build_assets.py has been run, the originals it resizes into assets/ can be left out:
+#source.exclude_patterns = pages/menu_page/*.png,pages/base_page/logo.png
 
 # (str) Application versioning (method 1)
 version = 0.1
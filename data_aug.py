@@ -1,101 +1,552 @@
 from PIL import Image
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+import numpy as np
+import argparse
+import csv
+import hashlib
+import json
+import math
+import os
 import random
 
 # Define augmentation parameters
-def augment_image(image):
+def sample_params(rng=random):
+    """Draw the rotation angle and zoom factor of one variant."""
     # Slight rotation
-    angle = random.uniform(-1.5, 1.5)  # Random rotation between -10 to 10 degrees
-    rotated_image = image.rotate(angle, resample=Image.BICUBIC, expand=False)
+    angle = rng.uniform(-1.5, 1.5)  # Random rotation between -1.5 to 1.5 degrees
 
     # Zoom in/out
-    scale = random.uniform(0.95, 1.05)  # Random zoom factor (0.8 = zoom out, 1.2 = zoom in)
-    w, h = rotated_image.size
-    new_w, new_h = int(w * scale), int(h * scale)
-    resized_image = rotated_image.resize((new_w, new_h), resample=Image.BICUBIC)
-
-    # If zoomed in, crop to original size; if zoomed out, pad to original size
-    if scale > 1.0:  # Zoom in: center crop
-        left = (new_w - w) // 2
-        top = (new_h - h) // 2
-        resized_image = resized_image.crop((left, top, left + w, top + h))
-    elif scale < 1.0:  # Zoom out: center pad
-        background = Image.new("RGB", (w, h), (0, 0, 0))  # Black background
-        left = (w - new_w) // 2
-        top = (h - new_h) // 2
-        background.paste(resized_image, (left, top))
-        resized_image = background
-
-    return resized_image
-
-# Load the image
+    scale = rng.uniform(0.95, 1.05)  # Random zoom factor (0.95 = zoom out, 1.05 = zoom in)
+    return angle, scale
+
+
+def affine_coefficients(src_size, size, angle, scale):
+    """Return the inverse affine mapping of a rotation and zoom about the image center.
+
+    The coefficients map a pixel of the ``size`` output back onto the ``src_size``
+    source, as expected by ``Image.transform(..., Image.AFFINE, ...)``. Any resize
+    from ``src_size`` to ``size`` is folded into the same mapping.
+    """
+    src_w, src_h = src_size
+    w, h = size
+    theta = math.radians(angle)
+    cos, sin = math.cos(theta) / scale, math.sin(theta) / scale
+    kx, ky = src_w / w, src_h / h
+
+    a, b = cos * kx, -sin * ky
+    d, e = sin * kx, cos * ky
+    c = src_w / 2 - a * w / 2 - b * h / 2
+    f = src_h / 2 - d * w / 2 - e * h / 2
+    return a, b, c, d, e, f
+
+
+def augment_image(image, rng=random, size=None, params=None):
+    """Rotate and zoom ``image`` about its center with a single bicubic resample.
+
+    Zooming in crops to the output size and zooming out pads with transparent black,
+    both within the same affine transform as the rotation. ``size``
+    sets the output size (the source size by default) and ``params`` an explicit
+    ``(angle, scale)`` pair instead of drawing one from ``rng``.
+    """
+    angle, scale = params if params is not None else sample_params(rng)
+    if image.mode != "RGBA":
+        image = image.convert("RGBA")
+    size = size or image.size
+    coefficients = affine_coefficients(image.size, size, angle, scale)
+    return image.transform(size, Image.AFFINE, coefficients, resample=Image.BICUBIC, fillcolor=(0, 0, 0, 0))
 
-import os
-from PIL import Image
 
 # Path to your folder containing images
-folder_path = "seepain_data/Schmerzzeichnungen/"
+FOLDER_PATH = "seepain_data/Schmerzzeichnungen/"
+
+# Folder the augmented images are written to
+OUTPUT_FOLDER = "seepain_data/aug_images/"
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+# Number of augmented variants per source drawing
+VARIANTS = 20
+
+# Number of images per .npy shard
+SHARD_SIZE = 128
+
+# Path to the background image the drawings are merged onto
+BACKGROUND_IMAGE_PATH = "background_image.png"
+
+# Define the threshold for "blackness"
+THRESHOLD = 255  # Adjust this value as needed
+
+# Backgrounds already loaded and resized, keyed by (path, size)
+_background_cache = {}
+
+
+def load_background(size, path=BACKGROUND_IMAGE_PATH):
+    """Return the RGBA background resized to ``size``, loading it only once per size."""
+    key = (path, size)
+    background = _background_cache.get(key)
+    if background is None:
+        background = Image.open(path).convert("RGBA").resize(size)
+        _background_cache[key] = background
+    return background
+
+
+def recolor_alpha_key(image, threshold=THRESHOLD):
+    """Turn "black" pixels white and make every white pixel transparent.
+
+    Works on the whole RGBA buffer at once and returns a uint8 array of shape (h, w, 4).
+    """
+    pixels = np.array(image.convert("RGBA"))
+    rgb = pixels[..., :3]
+
+    # Replace pixels "close enough" to black with white (preserve alpha)
+    blackish = (rgb < threshold).all(axis=-1)
+    rgb[blackish] = 255
+
+    # Make white pixels transparent
+    white = (rgb == 255).all(axis=-1)
+    pixels[white, 3] = 0
+    return pixels
+
+
+def composite_over(pixels, background):
+    """Merge an RGBA pixel array onto a background image of the same size."""
+    return Image.alpha_composite(background, Image.fromarray(pixels, "RGBA"))
+
+
+def recolor_and_composite(image, threshold=THRESHOLD, background_path=BACKGROUND_IMAGE_PATH):
+    """Recolor, alpha key and merge ``image`` onto the cached background."""
+    pixels = recolor_alpha_key(image, threshold)
+    height, width = pixels.shape[:2]
+    return composite_over(pixels, load_background((width, height), background_path))
+
+
+def task_seed(image_file, variant):
+    """Derive a stable seed from the source file name and the variant index."""
+    digest = hashlib.sha256(f"{image_file}:{variant}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def list_image_files(folder_path):
+    """Return the image files of a folder in a stable (sorted) order."""
+    return sorted(f for f in os.listdir(folder_path) if f.endswith(IMAGE_EXTENSIONS))
+
+
+def load_source(image_path):
+    """Decode a drawing and convert it to RGBA once, for reuse by all its variants."""
+    with Image.open(image_path) as org_image:
+        return org_image.convert("RGBA")
+
+
+def variant_params(image_file, variant):
+    """Return the ``(angle, scale)`` pair of one variant of a drawing."""
+    # Every variant gets its own generator, so the result does not depend on the worker
+    return sample_params(random.Random(task_seed(image_file, variant)))
+
+
+def augment_variant(source, image_file, variant, size=None):
+    """Return one augmented variant of a decoded drawing, merged onto the background."""
+    augmented_image = augment_image(source, size=size, params=variant_params(image_file, variant))
+
+    # Recolor, make white transparent and merge onto the background in one pass
+    return recolor_and_composite(augmented_image)
+
+
+def augment_task(task):
+    """Produce and save every variant of one drawing. Runs in a worker process."""
+    image_path, output_paths, size = task
+    source = load_source(image_path)
+    for i, output_path in enumerate(output_paths):
+        augment_variant(source, os.path.basename(image_path), i, size).save(output_path)
+    return output_paths
+
+
+def _array_task(task):
+    """Produce a range of variants of one drawing as RGBA arrays. Runs in a worker process."""
+    image_path, start, stop, size = task
+    source = load_source(image_path)
+    image_file = os.path.basename(image_path)
+    return [np.asarray(augment_variant(source, image_file, i, size)) for i in range(start, stop)]
+
+
+def output_paths_for(output_folder, image_file, variants=VARIANTS):
+    """Return the PNG paths of the variants of a drawing, named after the drawing.
+
+    The name keeps the drawing's extension, so ``a.png`` and ``a.jpg`` do not share outputs.
+    """
+    return [os.path.join(output_folder, f"aug_image_{image_file}_{i}.png") for i in range(variants)]
+
+
+def build_tasks(folder_path, output_folder, variants=VARIANTS, size=None, image_files=None):
+    """List one task per drawing of a folder, with the output paths of its variants."""
+    if image_files is None:
+        image_files = list_image_files(folder_path)
+    return [(os.path.join(folder_path, image_file), output_paths_for(output_folder, image_file, variants), size)
+            for image_file in image_files]
+
+
+def iter_augmented(folder_path=FOLDER_PATH, variants=VARIANTS, workers=None, prefetch=None, as_array=True,
+                   size=None, image_files=None):
+    """Yield ``(image_file, variant, image)`` for every augmented variant of a folder.
+
+    Variants are produced on the fly by a process pool. Each task makes a run of
+    consecutive variants of one drawing, sized so that at most ``prefetch``
+    variants are queued or done but not yet consumed while every worker has a
+    task, which bounds the memory used whatever the size of the folder or the
+    number of variants. ``prefetch`` defaults to four variants per worker;
+    ``workers`` is lowered if ``prefetch`` is too small to feed them all. Images
+    are uint8 RGBA arrays of shape (h, w, 4), or PIL images if ``as_array`` is False.
+    ``workers=0`` computes everything in the calling process. The order and content
+    of the results are the same for any number of workers. ``image_files`` restricts
+    the run to some drawings of the folder.
+    """
+    if image_files is None:
+        image_files = list_image_files(folder_path)
+
+    def convert(pixels):
+        return pixels if as_array else Image.fromarray(pixels, "RGBA")
+
+    if workers == 0:
+        for image_file in image_files:
+            for i, pixels in enumerate(_array_task((os.path.join(folder_path, image_file), 0, variants, size))):
+                yield image_file, i, convert(pixels)
+        return
+
+    # Split the prefetch budget into tasks of `chunk` variants: one per worker, plus the
+    # one the consumer is reading, which is not replaced until it is done
+    workers = workers or os.cpu_count() or 1
+    prefetch = max(1, 4 * (workers + 1) if prefetch is None else prefetch)
+    workers = min(workers, max(1, prefetch - 1))
+    chunk = max(1, min(variants, prefetch // (workers + 1)))
+    in_flight = prefetch // chunk  # Tasks submitted and not yet consumed
+    tasks = ((image_file, start, (os.path.join(folder_path, image_file), start, min(start + chunk, variants), size))
+             for image_file in image_files for start in range(0, variants, chunk))
+
+    executor = ProcessPoolExecutor(max_workers=max(1, min(workers, in_flight - 1)))
+    pending = deque()
+    try:
+        for image_file, start, task in tasks:
+            if len(pending) == in_flight:
+                done_file, done_start, future = pending.popleft()
+                for i, pixels in enumerate(future.result(), done_start):
+                    yield done_file, i, convert(pixels)
+            pending.append((image_file, start, executor.submit(_array_task, task)))
+
+        while pending:
+            done_file, done_start, future = pending.popleft()
+            for i, pixels in enumerate(future.result(), done_start):
+                yield done_file, i, convert(pixels)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+class ShardWriter:
+    """Write augmented images into fixed-size ``.npy`` shards plus a CSV index.
+
+    Each shard holds up to ``shard_size`` uint8 RGBA images of shape (h, w, 4) and
+    can be opened zero-copy with ``load_shard``. The index lists, for every image,
+    its shard and offset, the source drawing, the variant and its parameters.
+    """
+
+    INDEX_FIELDS = ("shard", "offset", "source", "variant", "seed", "angle", "scale")
+
+    def __init__(self, output_folder, size, shard_size=SHARD_SIZE, prefix="shard"):
+        self.output_folder = output_folder
+        self.size = size
+        self.shard_size = shard_size
+        self.prefix = prefix
+        self.shard_index = 0
+        self.shard = None
+        self.shard_path = None
+        self.offset = 0
+
+        os.makedirs(output_folder, exist_ok=True)
+        self.index_file = open(os.path.join(output_folder, f"{prefix}_index.csv"), "w", newline="")
+        self.index = csv.writer(self.index_file)
+        self.index.writerow(self.INDEX_FIELDS)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _open_shard(self):
+        width, height = self.size
+        shard_name = f"{self.prefix}_{self.shard_index:05d}.npy"
+        self.shard_path = os.path.join(self.output_folder, shard_name)
+        self.shard = np.lib.format.open_memmap(self.shard_path, mode="w+", dtype=np.uint8,
+                                               shape=(self.shard_size, height, width, 4))
+        self.offset = 0
+
+    def _close_shard(self):
+        if self.shard is None:
+            return
+        self.shard.flush()
+        if self.offset < self.shard_size:
+            # Shrink the last, partially filled shard to the images it holds
+            tmp_path = self.shard_path + ".tmp.npy"
+            np.save(tmp_path, self.shard[:self.offset])
+            del self.shard
+            os.replace(tmp_path, self.shard_path)
+        self.shard = None
+        self.shard_index += 1
+
+    def add(self, pixels, image_file, variant):
+        """Append one RGBA image and return its ``"<shard file>:<offset>"`` reference."""
+        angle, scale = variant_params(image_file, variant)
+        return self._append(pixels, (image_file, variant, task_seed(image_file, variant),
+                                     f"{angle:.6f}", f"{scale:.6f}"))
+
+    def _append(self, pixels, fields):
+        """Write one image and its index row (the fields after shard and offset)."""
+        if self.shard is None:
+            self._open_shard()
+
+        self.shard[self.offset] = pixels
+        shard_name = os.path.basename(self.shard_path)
+        self.index.writerow((shard_name, self.offset) + tuple(fields))
+        reference = f"{shard_name}:{self.offset}"
+
+        self.offset += 1
+        if self.offset == self.shard_size:
+            self._close_shard()
+        return reference
+
+    def close(self):
+        self._close_shard()
+        self.index_file.close()
+
+
+def load_shard(shard_path):
+    """Open a shard as a read-only memory map of shape (n, h, w, 4)."""
+    return np.load(shard_path, mmap_mode="r")
+
+
+def read_index(output_folder):
+    """Return the rows of every shard index of ``output_folder`` as dicts.
+
+    If the folder has manifests, rows superseded by a later run (drawings that
+    changed or were removed) are left out.
+    """
+    current = None
+    manifest_files = [f for f in os.listdir(output_folder) if f.startswith("manifest") and f.endswith(".json")]
+    if manifest_files:
+        current = set()
+        for manifest_file in manifest_files:
+            manifest = load_manifest(os.path.join(output_folder, manifest_file))
+            for entry in manifest["sources"].values():
+                current.update(entry["outputs"])
+
+    rows = []
+    for index_file in sorted(f for f in os.listdir(output_folder) if f.endswith("_index.csv")):
+        with open(os.path.join(output_folder, index_file), newline="") as f:
+            for row in csv.DictReader(f):
+                if current is None or f"{row['shard']}:{row['offset']}" in current:
+                    rows.append(row)
+    return rows
+
+
+def source_size(folder_path, image_files=None):
+    """Return the size of the first drawing of a folder, used as the shard image size."""
+    if image_files is None:
+        image_files = list_image_files(folder_path)
+    if not image_files:
+        raise ValueError(f"No images found in {folder_path}")
+    with Image.open(os.path.join(folder_path, image_files[0])) as image:
+        return image.size
+
+
+def file_sha256(path):
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def in_partition(image_file, partition):
+    """Tell whether a drawing belongs to partition ``(i, n)`` of the archive.
+
+    Drawings are assigned by a hash of their file name, so every machine agrees on
+    the split without coordinating, and it does not move when files are added.
+    """
+    i, n = partition
+    digest = hashlib.sha256(image_file.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % n == i
+
+
+def manifest_path_for(output_folder, partition=(0, 1)):
+    """Return the manifest path of one partition; each partition keeps its own."""
+    i, n = partition
+    name = "manifest.json" if n == 1 else f"manifest_{i}of{n}.json"
+    return os.path.join(output_folder, name)
+
+
+def load_manifest(path):
+    """Load a manifest, or return an empty one if it does not exist yet."""
+    if not os.path.exists(path):
+        return {"params": None, "runs": 0, "sources": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(path, manifest):
+    """Write a manifest atomically."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def outputs_exist(output_folder, outputs):
+    """Tell whether every output of a manifest entry is still on disk."""
+    return all(os.path.exists(os.path.join(output_folder, output.split(":")[0])) for output in outputs)
+
+
+def remove_outputs(output_folder, outputs):
+    """Delete the PNG outputs of a manifest entry that are still on disk."""
+    for output_path in outputs:
+        if os.path.exists(os.path.join(output_folder, output_path)):
+            os.remove(os.path.join(output_folder, output_path))
+
+
+def run(folder_path, output_folder, variants=VARIANTS, workers=1, size=None, output_format="png",
+        shard_size=SHARD_SIZE, partition=(0, 1), force=False):
+    """Augment the new or changed drawings of ``folder_path``, serially or on a process pool.
+
+    ``output_format`` is "png" for one PNG file per variant or "npy" for array shards
+    (see ``ShardWriter``); shards need a single image size, which defaults to the
+    size of the first drawing. Only the drawings of ``partition`` ``(i, n)`` are
+    processed. A manifest in ``output_folder`` records the content hash and outputs
+    of every drawing, so drawings already augmented with the same parameters are
+    skipped unless ``force`` is set.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    manifest_path = manifest_path_for(output_folder, partition)
+    manifest = load_manifest(manifest_path)
+    image_files = [f for f in list_image_files(folder_path) if in_partition(f, partition)]
+
+    if output_format == "npy" and size is None:
+        previous_size = (manifest["params"] or {}).get("size")
+        size = tuple(previous_size) if previous_size else source_size(folder_path, image_files or None)
+
+    params = {"variants": variants, "size": list(size) if size else None, "format": output_format,
+              "threshold": THRESHOLD, "background": BACKGROUND_IMAGE_PATH}
+    if force or manifest["params"] != params:
+        if manifest["params"] != params and (manifest["params"] or {}).get("format") == "png":
+            # The old variants would be left behind, or mixed with the new ones
+            for entry in manifest["sources"].values():
+                remove_outputs(output_folder, entry["outputs"])
+        manifest["sources"] = {}
+    manifest["params"] = params
+    sources = manifest["sources"]
 
-# Get the list of image files in the folder
-image_files = [f for f in os.listdir(folder_path) if f.endswith(('.png', '.jpg', '.jpeg', '.bmp'))]
+    # Forget drawings that were removed from the archive
+    for image_file in set(sources) - set(image_files):
+        if output_format == "png":
+            remove_outputs(output_folder, sources[image_file]["outputs"])
+        del sources[image_file]
 
-# Iterate over each image file
-for idx, image_file in enumerate(image_files, 0):  # Starts counting from 1
-    # Build the full path to the image
-    image_path = os.path.join(folder_path, image_file)
+    hashes = {}
+    todo = []
+    for image_file in image_files:
+        hashes[image_file] = file_sha256(os.path.join(folder_path, image_file))
+        entry = sources.get(image_file)
+        if entry is None or entry["sha256"] != hashes[image_file] or not outputs_exist(output_folder, entry["outputs"]):
+            todo.append(image_file)
 
-    # Open the image
-    org_image = Image.open(image_path)
+    print(f"{len(todo)} of {len(image_files)} drawings to augment")
+    try:
+        if output_format == "npy":
+            _run_shards(folder_path, output_folder, variants, workers, size, shard_size, partition, manifest,
+                        todo, hashes)
+        else:
+            _run_png(folder_path, output_folder, variants, workers, size, manifest, todo, hashes)
+    finally:
+        # Also record the drawings finished before an interruption
+        save_manifest(manifest_path, manifest)
 
-    # Run your loop 20 times on the image
 
-    for i in range(20):
+def _run_png(folder_path, output_folder, variants, workers, size, manifest, todo, hashes):
+    tasks = build_tasks(folder_path, output_folder, variants, size, todo)
 
-        # Perform augmentation
-        augmented_image = augment_image(org_image)
+    with ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext() as executor:
+        results = executor.map(augment_task, tasks) if executor else map(augment_task, tasks)
+        for image_file, output_paths in zip(todo, results):
+            for output_path in output_paths:
+                print(f"Augmented image saved to {output_path}")
+            manifest["sources"][image_file] = {
+                "sha256": hashes[image_file],
+                "outputs": [os.path.relpath(output_path, output_folder) for output_path in output_paths],
+            }
 
-        # Load the image
-        image = augmented_image.convert("RGBA")  # Replace with your image file path
 
-        # Get the pixel data
-        pixels = image.load()
+def _run_shards(folder_path, output_folder, variants, workers, size, shard_size, partition, manifest, todo, hashes):
+    if not todo:
+        return
 
-        # Define the threshold for "blackness"
-        threshold = 255  # Adjust this value as needed
+    # Every run writes its own shards, so earlier shards are never rewritten
+    i, n = partition
+    prefix = "shard" if n == 1 else f"shard_{i}of{n}"
+    prefix += f"_run{manifest['runs']:03d}"
+    manifest["runs"] += 1
 
-        # Loop through all pixels
-        width, height = image.size
-        for y in range(height):
-            for x in range(width):
-                r, g, b, a = pixels[x, y]  # Get RGBA values
+    outputs = []
+    with ShardWriter(output_folder, size, shard_size, prefix) as writer:
+        for image_file, variant, pixels in iter_augmented(folder_path, variants, workers if workers > 1 else 0,
+                                                          size=size, image_files=todo):
+            reference = writer.add(pixels, image_file, variant)
+            print(f"Augmented image saved to {reference}")
+            outputs.append(reference)
+            if variant == variants - 1:
+                manifest["sources"][image_file] = {"sha256": hashes[image_file], "outputs": outputs}
+                outputs = []
 
-                # Check if the pixel is "close enough" to black
-                if r < threshold and g < threshold and b < threshold:
-                    pixels[x, y] = (255, 255, 255, a)  # Replace with white (preserve alpha)
 
-        background_image_path = "background_image.png"  # Path to the background image
+def parse_size(value):
+    """Parse a WIDTHxHEIGHT command line argument."""
+    try:
+        width, height = (int(v) for v in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {value!r}")
+    return width, height
 
-        # Load the images
-        modified_image = image.convert("RGBA")  # Ensure RGBA mode
-        background_image = Image.open(background_image_path).convert("RGBA")  # Ensure RGBA mode
 
-        # Make white pixels transparent in the modified image
-        pixels = modified_image.load()
-        width, height = modified_image.size
+def parse_partition(value):
+    """Parse an i/N command line argument."""
+    try:
+        i, n = (int(v) for v in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {value!r}")
+    if not 0 <= i < n:
+        raise argparse.ArgumentTypeError(f"shard index must be in 0..{n - 1}, got {i}")
+    return i, n
 
-        for y in range(height):
-            for x in range(width):
-                r, g, b, a = pixels[x, y]  # Get RGBA values
-                if r == 255 and g == 255 and b == 255:  # Check if the pixel is white
-                    pixels[x, y] = (255, 255, 255, 0)  # Make it transparent
 
-        # Ensure the background image matches the size of the modified image
-        background_image = background_image.resize((width, height))
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Augment the SeePain pain drawings.")
+    parser.add_argument("--input", default=FOLDER_PATH, help="folder containing the source drawings")
+    parser.add_argument("--output", default=OUTPUT_FOLDER, help="folder the augmented images are written to")
+    parser.add_argument("--variants", type=int, default=VARIANTS, help="augmented variants per drawing")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of worker processes (0 = one per CPU core)")
+    parser.add_argument("--format", choices=("png", "npy"), default="png",
+                        help="one PNG per variant, or uint8 array shards with an index")
+    parser.add_argument("--size", type=parse_size, default=None,
+                        help="output size as WIDTHxHEIGHT (default: size of the source drawing)")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE, help="images per .npy shard")
+    parser.add_argument("--shard", type=parse_partition, default=(0, 1),
+                        help="only process partition i of N of the drawings, e.g. 0/4")
+    parser.add_argument("--force", action="store_true", help="ignore the manifest and augment every drawing")
+    args = parser.parse_args(argv)
 
-        # Merge the images
-        merged_image = Image.alpha_composite(background_image, modified_image)
+    workers = args.workers or os.cpu_count() or 1
+    run(args.input, args.output, args.variants, workers, args.size, args.format, args.shard_size, args.shard,
+        args.force)
 
-        # Save the resulting image
-        output_path = "seepain_data/aug_images/aug_image_" + str(idx) + "_" + str(i) + ".png"  # Path for the merged image
-        merged_image.save(output_path)
 
-        print(f"Augmented image saved to {output_path}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
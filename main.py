@@ -1,32 +1,49 @@
-from kivy.app import App
-from kivy.uix.screenmanager import ScreenManager
+# Imported first, so the report covers the imports below
+from pages import startup_timing
+from pages.startup_timing import timed
+
+with timed('import kivy'):
+    from kivy.app import App
 
 #from kivy.config import Config
 #Config.set('graphics', 'width', '480')  # Set the width
 #Config.set('graphics', 'height', '800')  # Set the height
 #Config.set('graphics', 'resizable', False)  # Optional: Make the window non-resizable
 
-from pages.base_page.base_page import FirstPage
-from pages.menu_page.menu_page import MenuPage
-#from pages.menu_page.patient_info.patient_page import PatientPage
-#from pages.menu_page.questionnaire_info.questionnaire_page import QuestionnairePage
-#from pages.menu_page.laboratory_info.laboratory_page import LaboratoryPage
-from pages.menu_page.seepain_info.seepain_page import SeePainPage
+with timed('create window'):
+    from kivy.core.window import Window
+
+with timed('import pages'):
+    from pages.base_page.base_page import FirstPage
+    from pages.lazy_screen_manager import LazyScreenManager
+    from pages.menu_page.menu_page import MenuPage
+    #from pages.menu_page.patient_info.patient_page import PatientPage
+    #from pages.menu_page.questionnaire_info.questionnaire_page import QuestionnairePage
+    #from pages.menu_page.laboratory_info.laboratory_page import LaboratoryPage
+    from pages.menu_page.seepain_info.seepain_page import SeePainPage
 
 
 class MyApp(App):
     def build(self):
         self.title = 'SeePain'  # Set the title here
         self.icon = "seepain_logo.png"
-        sm = ScreenManager()
-        sm.add_widget(FirstPage(name='first_page'))
-        sm.add_widget(MenuPage(name='menu_page'))
-        #sm.add_widget(PatientPage(name='patient_page'))
-        #sm.add_widget(QuestionnairePage(name='questionnaire_page'))
-        #sm.add_widget(LaboratoryPage(name='laboratory_page'))
-        sm.add_widget(SeePainPage(name='seepain_page'))
+        # Only the welcome screen is built before the first frame; the others are built
+        # when first shown, and their images are decoded in the background meanwhile
+        sm = LazyScreenManager()
+        with timed('screen first_page'):
+            sm.add_widget(FirstPage(name='first_page'))
+        sm.register('menu_page', MenuPage, MenuPage.asset_paths())
+        #sm.register('patient_page', PatientPage)
+        #sm.register('questionnaire_page', QuestionnairePage)
+        #sm.register('laboratory_page', LaboratoryPage)
+        sm.register('seepain_page', SeePainPage, SeePainPage.asset_paths())
+        sm.preload()
         return sm
 
+    def on_start(self):
+        # The startup report is written once the first frame is on screen
+        Window.fbind('on_flip', startup_timing.first_frame)
+
 
 if __name__ == '__main__':
     MyApp().run()
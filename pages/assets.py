@@ -0,0 +1,148 @@
+"""Image textures shared by the pages, decoded ahead of time on a background thread.
+
+Decoding a PNG is the slow part of loading it, and it needs no OpenGL context, so
+``preload`` decodes images on a worker thread while the welcome screen is shown.
+Only turning the decoded pixels into a texture, which ``texture`` does on first
+use, has to happen on the main thread.
+
+When ``build_assets.py`` has been run, images are resolved to the variant built
+for the screen density, which may be a region of an atlas page:
+
+    {"densities": {"mdpi": 1.0, ...},
+     "images": {"<original path>": {"mdpi": ["<file>", [x, y, w, h] or null], ...}}}
+
+Images missing from that index are loaded from their original file.
+"""
+import json
+import os
+import threading
+
+from kivy.core.image import Image as CoreImage, ImageLoader
+from kivy.logger import Logger
+from kivy.metrics import Metrics
+
+from .startup_timing import timed
+
+# Index of the per-density variants, built by build_assets.py
+ASSET_INDEX_PATH = 'assets/index.json'
+
+_index = None
+_lock = threading.Lock()
+_decoded = {}  # path -> image loader holding decoded pixels, no texture yet
+_pending = {}  # path -> Event set once a preload of it finished
+_textures = {}  # path -> texture
+_regions = {}  # original path -> texture of its variant
+
+
+def load_index(path=ASSET_INDEX_PATH):
+    """Read the index of the processed assets; None if they have not been built."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def density_bucket(densities, density):
+    """Name of the smallest bucket at least as dense as the screen, else the densest."""
+    buckets = sorted(densities, key=densities.get)
+    for bucket in buckets:
+        if densities[bucket] >= density:
+            return bucket
+    return buckets[-1]
+
+
+def resolve(path, density=None):
+    """File and atlas region (or None) to load ``path`` from, at the screen density."""
+    global _index
+    if _index is None:
+        _index = load_index() or {'densities': {}, 'images': {}}
+    variants = _index['images'].get(path)
+    if not variants:
+        return path, None
+    bucket = density_bucket(_index['densities'], Metrics.density if density is None else density)
+    if bucket not in variants:
+        return path, None
+    file, region = variants[bucket]
+    return file, region
+
+
+def preload(paths):
+    """Decode images on a background thread; returns the thread."""
+    paths = list(dict.fromkeys(resolve(path)[0] for path in paths))
+    with _lock:
+        # Missing files are reported by texture() when they are needed
+        paths = [path for path in paths if os.path.exists(path)
+                 and path not in _textures and path not in _decoded and path not in _pending]
+        for path in paths:
+            _pending[path] = threading.Event()
+
+    def work():
+        for path in paths:
+            try:
+                with timed(f'decode {path}'):
+                    loader = ImageLoader.load(path)
+            except Exception as e:
+                # texture() reports the error when the image is needed
+                Logger.warning(f"Assets: could not preload {path}: {e}")
+                loader = None
+            with _lock:
+                if loader is not None:
+                    _decoded[path] = loader
+                _pending.pop(path).set()
+
+    thread = threading.Thread(target=work, daemon=True)
+    thread.start()
+    return thread
+
+
+def texture(path):
+    """Texture of an image, from a preload if there was one; must run on the main thread.
+
+    Returns None, like an Image widget shows nothing, if the file does not exist.
+    """
+    result = _regions.get(path)
+    if result is not None:
+        return result
+    file, region = resolve(path)
+    result = _file_texture(file)
+    if result is not None and region is not None:
+        result = result.get_region(*region)
+    if result is not None:
+        _regions[path] = result
+    return result
+
+
+def _file_texture(path):
+    result = _textures.get(path)
+    if result is not None:
+        return result
+    if not os.path.exists(path):
+        Logger.error(f"Assets: image {path} not found")
+        return None
+
+    with _lock:
+        pending = _pending.get(path)
+    if pending is not None:
+        # Being decoded already: waiting is cheaper than decoding it twice
+        pending.wait()
+
+    with _lock:
+        loader = _decoded.pop(path, None)
+    with timed(f'texture {path}'):
+        result = loader.texture if loader is not None else CoreImage(path).texture
+    _textures[path] = result
+    return result
+
+
+def release(path):
+    """Forget the texture of an image, so it is freed once no widget shows it.
+
+    An atlas page is kept while other images on it are still in use.
+    """
+    file = resolve(path)[0]
+    _regions.pop(path, None)
+    if any(resolve(other)[0] == file for other in _regions):
+        return
+    _textures.pop(file, None)
+    with _lock:
+        _decoded.pop(file, None)
@@ -5,7 +5,7 @@ from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
 from kivy.uix.image import Image as KivyImage
 from kivy.uix.label import Label
-from kivy.core.image import Image as CoreImage
+from .. import assets
 
 
 class BasePage(Screen):
@@ -23,12 +23,14 @@ class BasePage(Screen):
 
 class FirstPage(BasePage):
 
+    LOGO_PATH = 'pages/base_page/logo.png'
+
     def __init__(self, **kwargs):
         super(FirstPage, self).__init__(**kwargs)
         layout = BoxLayout(orientation="vertical", spacing=10, padding=20)
 
         # Load the image
-        self.bg_image = CoreImage('pages/base_page/logo.png').texture
+        self.bg_image = assets.texture(self.LOGO_PATH)
 
         # Create an Image widget and set its texture, occupying top 20% of the screen
         image_widget = KivyImage()
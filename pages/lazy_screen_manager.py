@@ -0,0 +1,34 @@
+from kivy.uix.screenmanager import ScreenManager
+
+from . import assets
+from .startup_timing import timed
+
+
+class LazyScreenManager(ScreenManager):
+    """A ScreenManager whose screens are built the first time they are shown.
+
+    Screens are registered with a factory (usually the Screen class) and the images
+    they will need; ``preload`` decodes those images in the background, so building
+    a screen later on only has to create its widgets.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.factories = {}  # screen name -> factory called with name=...
+        self.asset_paths = {}  # screen name -> images the screen loads
+
+    def register(self, name, factory, asset_paths=()):
+        """Register a screen to build when it is first shown."""
+        self.factories[name] = factory
+        self.asset_paths[name] = list(asset_paths)
+
+    def preload(self):
+        """Decode the images of the screens not built yet, on a background thread."""
+        return assets.preload([path for name, paths in self.asset_paths.items()
+                               if not self.has_screen(name) for path in paths])
+
+    def get_screen(self, name):
+        if name in self.factories and not self.has_screen(name):
+            with timed(f'screen {name}'):
+                self.add_widget(self.factories[name](name=name))
+        return super().get_screen(name)
@@ -3,13 +3,32 @@ from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
 from kivy.uix.popup import Popup
 from ..base_page.base_page import BasePage
-from kivy.core.image import Image as CoreImage
+from .. import assets
 from kivy.uix.image import Image as KivyImage
 from kivy.uix.label import Label
 from kivy.uix.carousel import Carousel
 
 
 class MenuPage(BasePage):
+
+    # List of image paths and corresponding texts
+    IMAGE_TEXT_DATA = [
+        {'image': 'pages/menu_page/pen_tablet.png', 'text': "Nutzen Sie den beim Tablett liegenden Stift zum Zeichnen."},
+        {'image': 'pages/menu_page/pen_thickness.png', 'text': "Sie können die Bleistiftdicke mit dem Regler nach Wunsch anpassen."},
+        {'image': 'pages/menu_page/pain_value.png', 'text': "Sie können verschiedene Schmerzintensitäten angeben."},
+        {'image': 'pages/menu_page/info.png', 'text': "Wie man Pain Drawings richtig ausfüllt!"},
+        {'text': "Wenn Sie fertig sind, drücken Sie auf Einreichen und geben Ihr Pseudonym ein. \n\nFalls sie dies nicht wissen, geben sie Name und Geburtsdatum an. \n\nAnschließend füllen Sie den Fragebogen aus."},  # Slide with only text
+        {'text': "Zeichnen Sie nun Ihren durchschnittlichen Schmerz \nder letzten Woche in die Person ein."}
+    ]
+
+    # Slides on each side of the current one that keep their image loaded
+    SLIDE_WINDOW = 1
+
+    @classmethod
+    def asset_paths(cls):
+        """Images the page loads when it is first shown, for preloading."""
+        return [item['image'] for item in cls.IMAGE_TEXT_DATA[:cls.SLIDE_WINDOW + 1] if 'image' in item]
+
     def __init__(self, **kwargs):
         super(MenuPage, self).__init__(**kwargs)
 
@@ -21,17 +40,13 @@ class MenuPage(BasePage):
         top_nested_layout = BoxLayout(orientation="vertical")
         self.carousel = Carousel(direction='right', loop=False)  # Set loop to False
 
-        # List of image paths and corresponding texts
-        self.image_text_data = [
-            {'image': 'pages/menu_page/pen_tablet.png', 'text': "Nutzen Sie den beim Tablett liegenden Stift zum Zeichnen."},
-            {'image': 'pages/menu_page/pen_thickness.png', 'text': "Sie können die Bleistiftdicke mit dem Regler nach Wunsch anpassen."},
-            {'image': 'pages/menu_page/pain_value.png', 'text': "Sie können verschiedene Schmerzintensitäten angeben."},
-            {'image': 'pages/menu_page/info.png', 'text': "Wie man Pain Drawings richtig ausfüllt!"},
-            {'text': "Wenn Sie fertig sind, drücken Sie auf Einreichen und geben Ihr Pseudonym ein. \n\nFalls sie dies nicht wissen, geben sie Name und Geburtsdatum an. \n\nAnschließend füllen Sie den Fragebogen aus."},  # Slide with only text
-            {'text': "Zeichnen Sie nun Ihren durchschnittlichen Schmerz \nder letzten Woche in die Person ein."}
-        ]
-
-        for item in self.image_text_data:
+        self.image_text_data = self.IMAGE_TEXT_DATA
+        self.slide_images = {}  # slide index -> (image path, Image widget)
+        self.loaded_slides = set()  # Indices of the slides holding their texture
+        self.window_index = 0  # Slide the window was last placed around
+        self.window_direction = 1  # Direction of the last swipe, +1 forward or -1 back
+
+        for index, item in enumerate(self.image_text_data):
             slide_layout = BoxLayout(orientation="vertical")
 
             # Add Label for text
@@ -47,19 +62,21 @@ class MenuPage(BasePage):
             label.bind(size=label.setter('text_size'))  # Bind size to text_size for wrapping
             slide_layout.add_widget(label)
 
-            # Only add image if it exists in the item dictionary
+            # Only add image if it exists in the item dictionary; its texture is
+            # loaded by update_slide_window when the slide comes near
             if 'image' in item:
-                image_texture = CoreImage(item['image']).texture
                 image_widget = KivyImage()
-                image_widget.texture = image_texture
                 image_widget.size_hint_y = 1
                 slide_layout.add_widget(image_widget)
+                self.slide_images[index] = (item['image'], image_widget)
 
             # Add each slide (with text and optional image) to the carousel
             self.carousel.add_widget(slide_layout)
 
             # Bind the carousel's on_index property to check the button state
         self.carousel.bind(current_slide=self.check_button_state)
+        self.carousel.bind(current_slide=self.update_slide_window)
+        self.update_slide_window()
 
         top_nested_layout.add_widget(self.carousel)
 
@@ -131,6 +148,49 @@ class MenuPage(BasePage):
 
         self.add_widget(main_layout)
 
+    def update_slide_window(self, *args):
+        """Load the images of the slides around the current one and release the others."""
+        current = self.carousel.index or 0
+        if current != self.window_index:
+            self.window_direction = 1 if current > self.window_index else -1
+            self.window_index = current
+        # The slide the next swipe in the same direction brings into the window
+        next_index = current + self.window_direction * (self.SLIDE_WINDOW + 1)
+
+        ahead = []
+        for index, (path, image_widget) in self.slide_images.items():
+            if abs(index - current) <= self.SLIDE_WINDOW:
+                if index not in self.loaded_slides:
+                    image_widget.texture = assets.texture(path)
+                    self.loaded_slides.add(index)
+            elif index == next_index:
+                if index not in self.loaded_slides:
+                    ahead.append(path)
+            else:
+                self.release_slide(index)
+                # Also drops pixels decoded ahead for a swipe that went the other way
+                assets.release(path)
+        if ahead:
+            # Decode the next image in the background, so the next swipe does not wait for it;
+            # preload skips it if it is decoded already
+            assets.preload(ahead)
+
+    def release_slide(self, index):
+        if index in self.loaded_slides:
+            path, image_widget = self.slide_images[index]
+            image_widget.texture = None
+            assets.release(path)
+            self.loaded_slides.discard(index)
+
+    def on_pre_enter(self, *args):
+        self.update_slide_window()
+
+    def on_leave(self, *args):
+        # Nothing of the tutorial needs to stay in memory while drawing
+        for index, (path, _) in self.slide_images.items():
+            self.release_slide(index)
+            assets.release(path)
+
     def on_button_click(self, instance):
         # Check if we are on the last slide
         if self.carousel.index == len(self.image_text_data) - 1:
@@ -0,0 +1,153 @@
+"""Body-region label map aligned with the human template.
+
+The map is a raster of the template's size (or a scaled-down copy) holding one
+region label per pixel; label 0 is the background. It is built offline from
+``seepain_human_template.png`` by ``build_region_map.py`` and stored as ``SPR1``
+files: the magic, then a zlib-compressed payload of the raster width and height
+(little-endian uint16), the region names (a count, then length-prefixed UTF-8
+strings, label 1 first) and the labels row by row, top row first.
+
+Looking up the region of a point is a single index into the raster, so strokes
+can be assigned to regions in the app and in offline tools without any image
+processing. This module only needs the standard library.
+"""
+import math
+import os
+import struct
+import zlib
+
+MAGIC = b"SPR1"
+
+# Label map of seepain_human_template.png, built by build_region_map.py
+REGION_MAP_PATH = 'pages/menu_page/seepain_info/seepain_human_regions.spr'
+
+BACKGROUND = 0
+
+
+class RegionMap:
+    """Region labels of the template, looked up by template or widget coordinates."""
+
+    def __init__(self, width, height, names, labels):
+        self.width = width
+        self.height = height
+        self.names = [None] + list(names)  # names[label]; label 0 is the background
+        self.labels = bytes(labels)  # width * height labels, top row first
+
+    def __repr__(self):
+        return f"RegionMap({self.width}x{self.height}, {len(self.names) - 1} regions)"
+
+    def label_at(self, u, v):
+        """Label at template coordinates u, v in [0, 1), from the top left corner."""
+        col, row = int(u * self.width), int(v * self.height)
+        if 0 <= col < self.width and 0 <= row < self.height:
+            return self.labels[row * self.width + col]
+        return BACKGROUND
+
+    def labels_of_points(self, points, frame):
+        """Label of every point of a flat [x0, y0, x1, y1, ...] list.
+
+        Points are in the drawing widget's local coordinates (y up) and ``frame`` is
+        the (x, y, width, height) of the template in them, as DrawWidget.template_frame.
+        """
+        fx, fy, fw, fh = frame
+        sx, sy = self.width / fw, self.height / fh
+        top = fy + fh
+        width, height, labels = self.width, self.height, self.labels
+        result = []
+        for i in range(0, len(points) - 1, 2):
+            col, row = int((points[i] - fx) * sx), int((top - points[i + 1]) * sy)
+            if 0 <= col < width and 0 <= row < height:
+                result.append(labels[row * width + col])
+            else:
+                result.append(BACKGROUND)
+        return result
+
+    def region_of_point(self, x, y, frame):
+        """Name of the region under a point in local coordinates, or None."""
+        return self.names[self.labels_of_points((x, y), frame)[0]]
+
+    def labels_along_stroke(self, points, frame):
+        """Labels along a stroke of a flat [x0, y0, x1, y1, ...] list, as labels_of_points.
+
+        Each segment is sampled about once per label-map pixel, so a region a long
+        straight segment passes through is labelled even if no point lies in it.
+        """
+        fx, fy, fw, fh = frame
+        sx, sy = self.width / fw, self.height / fh
+        top = fy + fh
+        width, height, labels = self.width, self.height, self.labels
+        # Points in label-map pixels
+        cols = [(x - fx) * sx for x in points[0::2]]
+        rows = [(top - y) * sy for y in points[1::2]]
+        result = []
+        for i in range(len(cols)):
+            if i + 1 < len(cols):
+                dcol, drow = cols[i + 1] - cols[i], rows[i + 1] - rows[i]
+                steps = max(1, math.ceil(max(abs(dcol), abs(drow))))
+            else:
+                dcol = drow = 0
+                steps = 1  # The last point
+            for step in range(steps):
+                col, row = int(cols[i] + dcol * step / steps), int(rows[i] + drow * step / steps)
+                if 0 <= col < width and 0 <= row < height:
+                    result.append(labels[row * width + col])
+                else:
+                    result.append(BACKGROUND)
+        return result
+
+    def summarize(self, strokes, frame):
+        """Per region: how much was drawn in it and the pain levels drawn there.
+
+        ``strokes`` are Stroke objects (or anything with ``points`` and ``pain_level``).
+        ``points`` counts the samples of labels_along_stroke in the region, so it is
+        the stroke length there in label-map pixels, however the stroke was simplified.
+        """
+        summary = {}
+        for stroke in strokes:
+            for label in self.labels_along_stroke(stroke.points, frame):
+                if label == BACKGROUND:
+                    continue
+                entry = summary.setdefault(self.names[label], {'points': 0, 'pain_levels': set()})
+                entry['points'] += 1
+                entry['pain_levels'].add(stroke.pain_level)
+        return {name: {'points': entry['points'], 'pain_levels': sorted(entry['pain_levels']),
+                       'max_pain_level': max(entry['pain_levels'])}
+                for name, entry in sorted(summary.items())}
+
+
+def dump_region_map(region_map):
+    """Encode a RegionMap as SPR1 data."""
+    out = bytearray(struct.pack("<HHH", region_map.width, region_map.height, len(region_map.names) - 1))
+    for name in region_map.names[1:]:
+        encoded = name.encode("utf-8")
+        out += struct.pack("<B", len(encoded)) + encoded
+    out += region_map.labels
+    return MAGIC + zlib.compress(bytes(out), 9)
+
+
+def load_region_map_data(data):
+    """Decode SPR1 data into a RegionMap."""
+    if data[:4] != MAGIC:
+        raise ValueError("Not a SeePain region map")
+    data = zlib.decompress(data[4:])
+    width, height, count = struct.unpack_from("<HHH", data, 0)
+    pos = 6
+    names = []
+    for _ in range(count):
+        length = data[pos]
+        names.append(data[pos + 1:pos + 1 + length].decode("utf-8"))
+        pos += 1 + length
+    return RegionMap(width, height, names, data[pos:pos + width * height])
+
+
+def load_region_map(path=REGION_MAP_PATH):
+    """Load the region map of the template; None if it has not been built."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return load_region_map_data(f.read())
+
+
+def save_region_map(path, region_map):
+    with open(path, "wb") as f:
+        f.write(dump_region_map(region_map))
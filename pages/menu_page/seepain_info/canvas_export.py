@@ -0,0 +1,93 @@
+"""Off-screen export of a pain drawing at a fixed resolution.
+
+The strokes and the body template are rendered into an ``Fbo`` of ``EXPORT_SIZE``,
+independently of the screen size and of the zoom of the drawing widget, and the
+pixels are read back into a plain RGBA buffer. Encoding the buffer as a PNG only
+needs ``zlib`` and runs on a worker thread, so saving does not block the UI.
+"""
+import struct
+import threading
+import zlib
+
+from kivy.clock import Clock
+from kivy.graphics import (Fbo, ClearColor, ClearBuffers, Color, Rectangle, Line,
+                           PushMatrix, PopMatrix, Translate, Scale)
+from kivy.graphics.texture import Texture
+
+from .stroke_io import fit_frame
+
+# Width and height of exported drawings, in pixels
+EXPORT_SIZE = (1024, 1024)
+
+
+def render_strokes(strokes, frame, size=EXPORT_SIZE, template=None):
+    """Render strokes into an off-screen buffer; must run on the UI thread.
+
+    ``frame`` is the (x, y, width, height) of the body template in the strokes'
+    coordinates; it is fitted into ``size`` and ``template`` (a texture or a
+    ``TiledTemplate``, if given) is drawn there. Returns the pixels as bytes, RGBA with the top row first.
+    """
+    x, y, scale = fit_frame(frame, size)
+    fbo = Fbo(size=size)
+    with fbo:
+        ClearColor(1, 1, 1, 1)
+        ClearBuffers()
+        PushMatrix()
+        # Flip vertically so the buffer reads top row first, like an image file
+        Scale(1, -1, 1)
+        Translate(0, -size[1], 0)
+        if template is not None:
+            Color(1, 1, 1, 1)
+            width, height = frame[2] * scale, frame[3] * scale
+            if isinstance(template, Texture):
+                Rectangle(texture=template, pos=(x, y), size=(width, height))
+            else:
+                template.draw((x, y, width, height), width)
+        Translate(x, y, 0)
+        Scale(scale, scale, 1)
+        Translate(-frame[0], -frame[1], 0)
+        for stroke in strokes:
+            Color(*stroke.color)
+            Line(points=stroke.points.tolist(), width=stroke.width)
+        PopMatrix()
+    fbo.draw()
+    return fbo.pixels
+
+
+def encode_png(pixels, size):
+    """Encode RGBA pixels (top row first) as PNG data."""
+    width, height = size
+    stride = width * 4
+    # Every row starts with filter type 0 (None)
+    raw = b"".join(b"\x00" + pixels[row * stride:(row + 1) * stride] for row in range(height))
+
+    def chunk(kind, data):
+        return (struct.pack(">I", len(data)) + kind + data
+                + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw, 6))
+            + chunk(b"IEND", b""))
+
+
+def write_png_async(file_path, pixels, size, callback=None):
+    """Encode and write a PNG on a worker thread.
+
+    ``callback(file_path, error)`` is then called on the UI thread, with ``error``
+    None on success or the exception raised while writing.
+    """
+    def work():
+        error = None
+        try:
+            data = encode_png(pixels, size)
+            with open(file_path, "wb") as f:
+                f.write(data)
+        except Exception as e:
+            error = e
+        if callback:
+            Clock.schedule_once(lambda dt: callback(file_path, error))
+
+    thread = threading.Thread(target=work, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,54 @@
+from kivy.graphics import InstructionGroup, Line
+
+# Vertices per Line instruction; updating a chunk rebuilds only its own geometry
+CHUNK_SIZE = 32
+
+
+class ChunkedLine(InstructionGroup):
+    """A polyline drawn as a chain of short ``Line`` instructions.
+
+    Setting ``Line.points`` rebuilds the whole line, so growing a single ``Line``
+    by one vertex per touch event costs O(n) per event and O(n^2) per stroke.
+    Here only the last chunk is rebuilt, so appending a vertex or moving the last one
+    costs the same however long the stroke gets. Consecutive chunks share their end
+    point and the round caps hide the seams.
+    """
+
+    def __init__(self, points=(), width=1.0, chunk_size=CHUNK_SIZE, **kwargs):
+        super().__init__(**kwargs)
+        self.width = width
+        self.chunk_size = chunk_size
+        self.chunks = []
+        self._tail = []  # Points of the last chunk
+
+        points = list(points)
+        step = 2 * (chunk_size - 1)
+        for start in range(0, max(len(points) - 2, 1), step):
+            self._new_chunk(points[start:start + step + 2])
+
+    def _new_chunk(self, points):
+        self._tail = list(points)
+        line = Line(points=self._tail, width=self.width)
+        self.chunks.append(line)
+        self.add(line)
+
+    @property
+    def points(self):
+        """All points of the line, as one flat list (built on demand)."""
+        points = []
+        for chunk in self.chunks:
+            points.extend(chunk.points[2:] if points else chunk.points)
+        return points
+
+    def append(self, x, y):
+        """Add a vertex at the end of the line."""
+        if len(self._tail) >= 2 * self.chunk_size:
+            # Start a new chunk from the last vertex of the full one
+            self._new_chunk(self._tail[-2:])
+        self._tail.extend((x, y))
+        self.chunks[-1].points = self._tail
+
+    def move_last(self, x, y):
+        """Move the last vertex of the line."""
+        self._tail[-2:] = (x, y)
+        self.chunks[-1].points = self._tail
@@ -0,0 +1,125 @@
+"""Painted area per pain level, kept up to date while the patient draws.
+
+The drawing area is divided into square cells of ``cell_size`` local units. A cell
+counts as painted by a stroke when its center lies under the drawn line, i.e.
+within the Kivy line width of one of the stroke's segments. For every pain level
+the grid counts how many strokes paint each cell; segments are stamped as they are
+drawn and unstamped when a stroke is erased or undone, so the painted area of a
+level is just the number of cells it holds and is read in constant time.
+"""
+import math
+
+from .stroke_grid import segment_distance
+
+# Side of a coverage cell, in local units (pixels of the drawing widget)
+CELL_SIZE = 4
+
+
+class PainCoverage:
+    """Occupancy grids of the painted cells, one per pain level plus their union.
+
+    Strokes are registered with a hashable key, like in ``StrokeGrid``; call
+    ``update`` after points were appended to a stroke or its last point moved.
+    """
+
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.levels = {}  # pain level -> {cell: number of strokes painting it}
+        self.union = {}  # cell -> number of strokes painting it, any level
+        self.strokes = {}  # key -> [stroke, final segments stamped, {cell: segment count}, last segment cells]
+
+    def __len__(self):
+        return len(self.strokes)
+
+    def _segment_cells(self, stroke, i):
+        points = stroke.points
+        x0, y0, x1, y1 = points[2 * i:2 * i + 4]
+        radius = stroke.width  # A Kivy line is drawn ``width`` to each side of its points
+        size = self.cell_size
+        cells = []
+        for col in range(int(math.floor((min(x0, x1) - radius) / size)),
+                         int(math.floor((max(x0, x1) + radius) / size)) + 1):
+            for row in range(int(math.floor((min(y0, y1) - radius) / size)),
+                             int(math.floor((max(y0, y1) + radius) / size)) + 1):
+                if segment_distance((col + 0.5) * size, (row + 0.5) * size, x0, y0, x1, y1) <= radius:
+                    cells.append((col, row))
+        return cells
+
+    def _cover(self, level, cell):
+        cells = self.levels.setdefault(level, {})
+        cells[cell] = cells.get(cell, 0) + 1
+        self.union[cell] = self.union.get(cell, 0) + 1
+
+    def _uncover(self, level, cell):
+        cells = self.levels[level]
+        if cells[cell] == 1:
+            del cells[cell]
+        else:
+            cells[cell] -= 1
+        if self.union[cell] == 1:
+            del self.union[cell]
+        else:
+            self.union[cell] -= 1
+
+    def _stamp(self, entry, cells):
+        stroke, _, counts, _ = entry
+        for cell in cells:
+            count = counts.get(cell, 0)
+            counts[cell] = count + 1
+            if not count:
+                self._cover(stroke.pain_level, cell)
+
+    def _unstamp(self, entry, cells):
+        stroke, _, counts, _ = entry
+        for cell in cells:
+            if counts[cell] == 1:
+                del counts[cell]
+                self._uncover(stroke.pain_level, cell)
+            else:
+                counts[cell] -= 1
+
+    def add(self, key, stroke):
+        """Register a stroke and stamp all of its segments."""
+        self.strokes[key] = [stroke, 0, {}, ()]
+        self.update(key)
+
+    def update(self, key):
+        """Stamp the segments added to a stroke since the last call.
+
+        Only the last segment can still change (when the last point moves), so it is
+        unstamped and stamped again; the others are stamped once.
+        """
+        entry = self.strokes[key]
+        stroke = entry[0]
+        segments = len(stroke.points) // 2 - 1
+        if entry[3]:
+            self._unstamp(entry, entry[3])
+            entry[3] = ()
+        for i in range(entry[1], segments - 1):
+            self._stamp(entry, self._segment_cells(stroke, i))
+        entry[1] = max(entry[1], segments - 1)
+        if segments >= 1:
+            entry[3] = self._segment_cells(stroke, segments - 1)
+            self._stamp(entry, entry[3])
+
+    def remove(self, key):
+        """Forget a stroke and the cells it painted."""
+        entry = self.strokes.pop(key, None)
+        if entry is None:
+            return
+        level = entry[0].pain_level
+        for cell in entry[2]:
+            self._uncover(level, cell)
+
+    def area(self, level=None):
+        """Painted area of a pain level (of all levels if None), in square local units."""
+        cells = self.union if level is None else self.levels.get(level, ())
+        return len(cells) * self.cell_size * self.cell_size
+
+    def summary(self, frame_area):
+        """Painted area and coverage (fraction of ``frame_area``) per pain level and in total."""
+        levels = {level: {'area': self.area(level), 'coverage': self.area(level) / frame_area}
+                  for level in sorted(self.levels) if self.levels[level]}
+        total = self.area()
+        return {'cell_size': self.cell_size, 'frame_area': frame_area, 'levels': levels,
+                'total': {'area': total, 'coverage': total / frame_area}}
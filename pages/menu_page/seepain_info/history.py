@@ -0,0 +1,117 @@
+"""Undo/redo history of a drawing, as a log of commands with a memory cap.
+
+Every change of the drawing is one command: drawing a stroke, one eraser gesture
+(which may remove strokes and add the pieces left over), or clearing everything.
+Undoing or redoing a command only touches the strokes it names, and clearing is
+recorded as a swap of the whole drawing, so both cost the same however large the
+drawing or the history is. Commands keep the strokes they removed alive; once the
+history holds more than ``max_bytes`` of them, the oldest commands are dropped.
+"""
+from collections import deque
+
+# Default memory cap of a history, in bytes of stroke data it keeps alive
+MAX_BYTES = 16 * 1024 * 1024
+
+# Rough cost of one recorded operation, so long runs of small commands are capped too
+OP_BYTES = 64
+
+
+class EditCommand:
+    """Strokes added to and removed from the drawing, in the order it happened.
+
+    The target (a ``DrawWidget``) must provide ``attach_stroke(stroke, index)`` and
+    ``detach_stroke(stroke)``.
+    """
+
+    ADD = 1
+    REMOVE = 2
+
+    def __init__(self):
+        self.ops = []  # (ADD or REMOVE, stroke, index in the drawing)
+        self.nbytes = 0
+
+    def __bool__(self):
+        return bool(self.ops)
+
+    def add(self, stroke, index):
+        self.ops.append((self.ADD, stroke, index))
+        self.nbytes += OP_BYTES
+
+    def remove(self, stroke, index):
+        self.ops.append((self.REMOVE, stroke, index))
+        self.nbytes += OP_BYTES + stroke.nbytes
+
+    def undo(self, target):
+        for op, stroke, index in reversed(self.ops):
+            if op == self.ADD:
+                target.detach_stroke(stroke)
+            else:
+                target.attach_stroke(stroke, index)
+
+    def redo(self, target):
+        for op, stroke, index in self.ops:
+            if op == self.ADD:
+                target.attach_stroke(stroke, index)
+            else:
+                target.detach_stroke(stroke)
+
+
+class SwapCommand:
+    """A change that replaced the whole drawing, e.g. clearing it.
+
+    ``drawing`` is the state returned by the target's ``swap_drawing``; undoing or
+    redoing swaps it back in, so the command costs O(1) whatever the drawing holds.
+    """
+
+    def __init__(self, drawing, nbytes=0):
+        self.drawing = drawing
+        self.nbytes = OP_BYTES + nbytes
+
+    def undo(self, target):
+        self.drawing = target.swap_drawing(self.drawing)
+
+    redo = undo
+
+
+class History:
+    """Undo and redo stacks of commands, keeping at most ``max_bytes`` of stroke data."""
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.undo_stack = deque()
+        self.redo_stack = []
+        self.nbytes = 0
+
+    def __len__(self):
+        return len(self.undo_stack)
+
+    def push(self, command):
+        """Record a command that was just applied; this discards the redo stack."""
+        for dropped in self.redo_stack:
+            self.nbytes -= dropped.nbytes
+        self.redo_stack.clear()
+        self.undo_stack.append(command)
+        self.nbytes += command.nbytes
+        while self.nbytes > self.max_bytes and len(self.undo_stack) > 1:
+            self.nbytes -= self.undo_stack.popleft().nbytes
+
+    def undo(self, target):
+        if not self.undo_stack:
+            return False
+        command = self.undo_stack.pop()
+        command.undo(target)
+        self.redo_stack.append(command)
+        return True
+
+    def redo(self, target):
+        if not self.redo_stack:
+            return False
+        command = self.redo_stack.pop()
+        command.redo(target)
+        self.undo_stack.append(command)
+        return True
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.nbytes = 0
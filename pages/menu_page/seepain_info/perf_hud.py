@@ -0,0 +1,130 @@
+"""Debug overlay with the performance numbers of the drawing screen.
+
+Shown over the DrawWidget when the ``SEEPAIN_HUD`` environment variable is set,
+or toggled with a triple tap on the pain level caption, so staff can read off
+the numbers on the device when drawing gets slow:
+
+- rendered frames per second, and the time between frames while drawing;
+- touch-to-ink latency: from the touch event to the frame showing its point;
+- strokes and points in the drawing, and the canvas instructions of the
+  DrawWidget, of which those in the baked stroke layer are not drawn per frame;
+- resident memory of the process.
+"""
+import os
+import time
+from collections import deque
+
+from kivy.clock import Clock
+from kivy.core.window import Window
+from kivy.graphics import Color, Rectangle
+from kivy.uix.label import Label
+
+# Environment variable that shows the overlay from the start
+ENV_VAR = 'SEEPAIN_HUD'
+
+# Seconds between updates of the text; rendering it every frame would skew the numbers
+UPDATE_INTERVAL = 0.5
+
+# Frame and latency samples the numbers are taken over
+SAMPLES = 120
+
+# Gaps between frames longer than this are idle time (nothing to redraw), not frame time
+IDLE_GAP = 0.25
+
+
+def enabled_by_env():
+    return os.environ.get(ENV_VAR, '') not in ('', '0')
+
+
+def process_memory():
+    """Resident memory of the process in bytes, from /proc; None if unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def count_instructions(instruction):
+    """Number of canvas instructions in an instruction group, nested groups included."""
+    children = getattr(instruction, 'children', None)
+    return 1 + sum(count_instructions(child) for child in children) if children else 1
+
+
+class PerfHud(Label):
+    """Label listing the performance numbers of a DrawWidget, updated while shown."""
+
+    def __init__(self, draw_widget, **kwargs):
+        kwargs.setdefault('font_size', '14sp')
+        super().__init__(color=(1, 1, 1, 1), halign='left', valign='top', size_hint=(None, None),
+                         padding=(8, 6), **kwargs)
+        self.draw_widget = draw_widget
+        self.frame_times = deque(maxlen=SAMPLES)
+        self.latencies = deque(maxlen=SAMPLES)
+        self._last_flip = None
+        self._event = None
+
+        with self.canvas.before:
+            Color(0, 0, 0, 0.6)
+            self.rect = Rectangle(pos=self.pos, size=self.size)
+        self.bind(pos=self._update_rect, size=self._update_rect)
+        self.bind(texture_size=self.setter('size'))
+
+    def _update_rect(self, *args):
+        self.rect.pos = self.pos
+        self.rect.size = self.size
+
+    @property
+    def running(self):
+        return self._event is not None
+
+    def start(self):
+        if self.running:
+            return
+        self.frame_times.clear()
+        self.latencies.clear()
+        self._last_flip = None
+        Window.fbind('on_flip', self.on_flip)
+        self._event = Clock.schedule_interval(self.update, UPDATE_INTERVAL)
+        self.update()
+
+    def stop(self):
+        if not self.running:
+            return
+        Window.funbind('on_flip', self.on_flip)
+        self._event.cancel()
+        self._event = None
+
+    def on_flip(self, *args):
+        now = time.perf_counter()
+        if self._last_flip is not None and now - self._last_flip < IDLE_GAP:
+            self.frame_times.append(now - self._last_flip)
+        self._last_flip = now
+
+        # The live stroke's last point is on screen now
+        ink_time = self.draw_widget.ink_time
+        if ink_time is not None:
+            self.latencies.append(time.time() - ink_time)
+            self.draw_widget.ink_time = None
+
+    def update(self, *args):
+        draw_widget = self.draw_widget
+        lines = [f"{Clock.get_rfps()} fps"]
+        if self.frame_times:
+            lines[0] += (f", frame {sum(self.frame_times) / len(self.frame_times) * 1000:.1f} ms"
+                         f" (max {max(self.frame_times) * 1000:.1f})")
+        if self.latencies:
+            lines.append(f"touch to ink {sum(self.latencies) / len(self.latencies) * 1000:.1f} ms"
+                         f" (max {max(self.latencies) * 1000:.1f})")
+        else:
+            lines.append("touch to ink -")
+
+        lines.append(f"strokes {len(draw_widget.strokes)}, points {sum(len(s) for s in draw_widget.strokes)}")
+        total = sum(count_instructions(canvas) for canvas in
+                    (draw_widget.canvas.before, draw_widget.canvas, draw_widget.canvas.after))
+        baked = count_instructions(draw_widget.stroke_layer)
+        lines.append(f"instructions {total} ({total - baked} per frame)")
+
+        memory = process_memory()
+        lines.append(f"memory {memory / 2 ** 20:.0f} MB" if memory is not None else "memory -")
+        self.text = '\n'.join(lines)
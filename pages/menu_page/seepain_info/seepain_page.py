@@ -1,7 +1,7 @@
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
-from kivy.graphics import Line, Color, Rectangle, Ellipse
+from kivy.graphics import Color, Rectangle, Ellipse, InstructionGroup, Fbo, ClearColor, ClearBuffers, Scale
 from kivy.properties import BooleanProperty
 from kivy.uix.scatter import Scatter
 from kivy.uix.relativelayout import RelativeLayout
@@ -10,9 +10,28 @@ from kivy.uix.slider import Slider
 from kivy.uix.label import Label
 from kivy.uix.popup import Popup
 from kivy.uix.textinput import TextInput
+import bisect
+import itertools
+import json
+import math
 import os
+import random
+import time
 from kivy.uix.screenmanager import Screen
 from kivy.clock import Clock
+from ...assets import texture as asset_texture
+from .body_regions import load_region_map
+from .canvas_export import EXPORT_SIZE, render_strokes, write_png_async
+from .chunked_line import ChunkedLine
+from .coverage import PainCoverage
+from .history import History, EditCommand, SwapCommand
+from .perf_hud import PerfHud, enabled_by_env as hud_enabled_by_env
+from .stroke import Stroke, PAIN_COLORS
+from .stroke_aug import augment_strokes, rasterize_strokes
+from .stroke_io import save_strokes, read_strokes, map_strokes, EXTENSION as STROKE_EXTENSION
+from .stroke_grid import StrokeGrid, split_outside_circle
+from .stroke_simplify import StrokeSimplifier, TOLERANCE_FACTOR
+from .template_tiles import TiledTemplate, load_tile_index
 
 # Check if we are running on Android
 try:
@@ -23,6 +42,19 @@ except ImportError:
     android_imported = False
     print("Running on non-Android platform, android-specific features won't work.")
 
+# Human template the pain is drawn on
+TEMPLATE_PATH = 'pages/menu_page/seepain_info/seepain_human_template.png'
+
+# Resolution of the baked stroke layer relative to the widget, so strokes stay sharp when zoomed in
+BAKE_SCALE = 2
+
+# Largest side of the baked stroke layer texture, in pixels
+MAX_BAKE_SIZE = 4096
+
+
+def stroke_order(stroke):
+    return stroke.order
+
 
 # 1. Drawing Class
 class DrawWidget(Scatter):
@@ -36,85 +68,140 @@ class DrawWidget(Scatter):
         self.do_rotation = False
         self.line_width = 10
         self.color = (1, 0, 0, 1)
-        self.lines = []
-        self.colors = []
+        self.pain_level = 10  # Pain slider value the current color belongs to
+        self.strokes = []  # Stroke objects, in drawing order (ascending Stroke.order)
+        self.strokes_by_id = {}  # Stroke.id -> stroke, for the keys the grid returns
         self.eraser_enabled = False
-        self.undo_stack = []  # Stack to store removed lines for undo
-        self.redo_stack = []  # Stack to store undone lines for redo
-        self.redo_color_stack = []
-        self.undo_color_stack = []
+        self.history = History()  # Undo/redo log of draw, erase and clear commands
         self.eraser_indicator = None  # To store the reference to the eraser indicator
         self.eraser_size = 70  # Diameter of the eraser indicator circle
+        self.grid = StrokeGrid()  # Spatial index of the line segments, for the eraser
+        self.coverage = PainCoverage()  # Painted area per pain level
+        self.regions = load_region_map()  # Body-region label map of the template, None if not built
+        self.simplify_tolerance = TOLERANCE_FACTOR  # Allowed deviation as a fraction of line_width, 0 = off
+        self._stroke_ids = itertools.count()
+        self.export_pixels = None  # RGBA pixels of the last export, top row first
+        self.export_size = None  # Width and height of export_pixels
+        self.ink_time = None  # Time of the last touch drawn into a live stroke, for the PerfHud latency
 
         # Add a white background
         with self.canvas.before:
             Color(1, 1, 1, 1)  # White color
             self.rect = Rectangle(size=self.size, pos=self.pos)
 
-        # Load the background image with correct properties
-        self.background_image = Image(source='pages/menu_page/seepain_info/seepain_human_template.png',
-                                      allow_stretch=True,
-                                      keep_ratio=True)
-        self.background_image.size_hint_y = None
-        self.background_image.height = self.height  # Adjust this to control the image height
-        self.background_image.center_x = self.center_x  # Center the image horizontally
-        self.add_widget(self.background_image)
+        # Draw the template from its tile pyramid if it was built (see template_tiles),
+        # at the detail level matching the zoom
+        tile_index = load_tile_index()
+        self.template_tiles = TiledTemplate(index=tile_index) if tile_index else None
+        self.background_image = None
+        if self.template_tiles is not None:
+            self.canvas.add(self.template_tiles)
+            self._template_trigger = Clock.create_trigger(self.update_template)
+            self.bind(transform=self._template_trigger)
+        else:
+            # Load the background image with correct properties
+            self.background_image = Image(texture=asset_texture(TEMPLATE_PATH),
+                                          allow_stretch=True,
+                                          keep_ratio=True)
+            self.background_image.size_hint_y = None
+            self.background_image.height = self.height  # Adjust this to control the image height
+            self.background_image.center_x = self.center_x  # Center the image horizontally
+            self.add_widget(self.background_image)
+
+        # Finished strokes are rendered into a texture, above the template. The Fbo only
+        # renders them again when they change (new stroke, undo, erase, clear), so every
+        # frame draws a single textured rectangle however dense the drawing is
+        self.stroke_layer = InstructionGroup()
+        with self.canvas:
+            self.stroke_fbo = Fbo(size=self.bake_size())
+            Color(1, 1, 1, 1)
+            self.stroke_rect = Rectangle(texture=self.stroke_fbo.texture, pos=(0, 0), size=self.size)
+        with self.stroke_fbo:
+            ClearColor(0, 0, 0, 0)
+            ClearBuffers()
+            self.stroke_scale = Scale(self.bake_scale())
+        self.stroke_fbo.add(self.stroke_layer)
+
+        # The strokes being drawn stay live geometry until the touch ends
+        self.live_layer = InstructionGroup()
+        self.canvas.add(self.live_layer)
 
     def on_size(self, *args):
-        # Update image dimensions when the widget size changes
-        self.background_image.width = self.width
-        self.background_image.height = self.height
-        self.background_image.center_x = self.center_x  # Center image when size changes
+        if self.template_tiles is not None:
+            self._template_trigger()
+        else:
+            # Update image dimensions when the widget size changes
+            self.background_image.width = self.width
+            self.background_image.height = self.height
+            self.background_image.center_x = self.center_x  # Center image when size changes
 
         # Update the rectangle size to cover the background
         self.rect.size = self.size
 
+        # Resize the baked stroke layer; the Fbo makes a new texture and renders the strokes again
+        self.stroke_scale.x = self.stroke_scale.y = self.bake_scale()
+        self.stroke_fbo.size = self.bake_size()
+        self.stroke_rect.texture = self.stroke_fbo.texture
+        self.stroke_rect.size = self.size
+
+    def update_template(self, *args):
+        """Show the template tiles matching the current zoom and the visible part of the drawing."""
+        frame = self.template_frame()
+        if self.parent is None:
+            visible = (0, 0, self.width, self.height)
+        else:
+            # The parent's area, in local coordinates, is what can be seen of the drawing
+            px, py = (0, 0) if isinstance(self.parent, RelativeLayout) else self.parent.pos
+            x0, y0 = self.to_local(px, py)
+            x1, y1 = self.to_local(px + self.parent.width, py + self.parent.height)
+            visible = (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+        self.template_tiles.update(frame, frame[2] * self.scale, visible)
+
+    def bake_scale(self):
+        """Pixels of the baked stroke layer per local unit."""
+        return min(BAKE_SCALE, MAX_BAKE_SIZE / max(self.width, self.height, 1))
+
+    def bake_size(self):
+        scale = self.bake_scale()
+        return max(1, int(self.width * scale)), max(1, int(self.height * scale))
+
     def on_touch_down(self, touch):
         # Check if the drawing mode is enabled
         if self.is_drawing:
             # Check if the touch is within the widget bounds
             if self.collide_point(*touch.pos):
-                with self.canvas:
-                    Color(*self.color)  # Set the drawing color
-
-                    # Get the local coordinates using self.to_local
-                    local_x, local_y = self.to_local(*touch.pos)
-
-                    if self.eraser_enabled:
-                        # Show the eraser indicator
-                        if not self.eraser_indicator:
-                            with self.canvas:
-                                Color(1, 0, 0, 0.5)  # Semi-transparent red color for visibility
-                                self.eraser_indicator = Ellipse(pos=(local_x - self.eraser_size / 2, local_y - self.eraser_size / 2),
-                                                                size=(self.eraser_size, self.eraser_size))
-
-                        # Eraser functionality
-                        for line in self.lines:
-                            # Check each segment of the line for proximity to the touch position
-                            for i in range(0, len(line['original_points']), 2):
-                                if abs(local_x - line['original_points'][i]) < 40 and \
-                                        abs(local_y - line['original_points'][i + 1]) < 40:  # Adjust threshold as needed
-
-                                    # Remove the point from the original points
-                                    line['original_points'].pop(i)  # Remove corresponding x-coordinate
-                                    line['original_points'].pop(i)  # Remove corresponding y-coordinate
-                                    self.canvas.remove(line['line'])  # Optionally remove the line from the canvas
-                                    self.lines.remove(line)  # Remove line entry
-                                    break  # Exit the loop once a point is erased
-
-                    else:
-                        # Drawing mode
-                        touch.ud["line"] = Line(points=(local_x, local_y), width=self.line_width)
-                        # Store original points
-                        self.lines.append({
-                            'line': touch.ud["line"],
-                            'original_points': [local_x, local_y]
-                        })
-                        self.colors.append(self.color)
-
-                # Clear the redo stack when drawing a new line
-                self.redo_stack.clear()
-                self.redo_color_stack.clear()
+                # Get the local coordinates using self.to_local
+                local_x, local_y = self.to_local(*touch.pos)
+
+                if self.eraser_enabled:
+                    # Show the eraser indicator
+                    if not self.eraser_indicator:
+                        with self.canvas:
+                            self.eraser_indicator_color = Color(1, 0, 0, 0.5)  # Semi-transparent red color for visibility
+                            self.eraser_indicator = Ellipse(pos=(local_x - self.eraser_size / 2, local_y - self.eraser_size / 2),
+                                                            size=(self.eraser_size, self.eraser_size))
+
+                    # Eraser functionality; the whole gesture is undone at once
+                    touch.ud["eraser"] = (local_x, local_y)
+                    touch.ud["edit"] = EditCommand()
+                    self.erase_at(local_x, local_y, touch.ud["edit"])
+
+                else:
+                    # Drawing mode
+                    stroke = self.add_stroke((local_x, local_y), self.color, self.line_width, self.pain_level,
+                                             live=True)
+                    stroke.start_time = time.time()
+                    stroke.times.append(0.0)
+                    touch.ud["line"] = stroke.line
+                    touch.ud["stroke"] = stroke
+                    self.ink_time = touch.time_update
+                    touch.ud["simplifier"] = (StrokeSimplifier.for_width(local_x, local_y, self.line_width,
+                                                                         self.simplify_tolerance)
+                                              if self.simplify_tolerance else None)
+
+                    edit = EditCommand()
+                    edit.add(stroke, len(self.strokes) - 1)
+                    self.history.push(edit)
                 return True
         else:
             # Handle other touch actions (like moving the image)
@@ -126,68 +213,280 @@ class DrawWidget(Scatter):
 
     def on_touch_move(self, touch):
         if self.is_drawing and "line" in touch.ud:
-            touch.ud["line"].points += self.to_local(*touch.pos)
-
+            stroke = touch.ud["stroke"]
+            if self.strokes_by_id.get(stroke.id) is not stroke:
+                # Undone or cleared while being drawn; the rest of the touch draws nothing
+                for key in ("line", "stroke", "simplifier"):
+                    touch.ud.pop(key, None)
+                return
             local_x, local_y = self.to_local(*touch.pos)
 
-            self.lines[-1]['original_points'].extend([local_x, local_y])
+            # Only keep the samples needed to draw the same shape at this line width
+            points = stroke.points
+            simplifier = touch.ud["simplifier"]
+            elapsed = time.time() - stroke.start_time
+            if simplifier is None or simplifier.add(local_x, local_y) == StrokeSimplifier.APPEND:
+                points.extend((local_x, local_y))
+                stroke.times.append(elapsed)
+                touch.ud["line"].append(local_x, local_y)
+            else:
+                points[-2] = local_x
+                points[-1] = local_y
+                stroke.times[-1] = elapsed
+                touch.ud["line"].move_last(local_x, local_y)
+            self.ink_time = touch.time_update
+
+            self.grid.update(stroke.id)
+            self.coverage.update(stroke.id)
+        elif self.is_drawing and "eraser" in touch.ud:
+            local_x, local_y = self.to_local(*touch.pos)
+            if self.eraser_indicator:
+                self.eraser_indicator.pos = (local_x - self.eraser_size / 2, local_y - self.eraser_size / 2)
+
+            # Erase along the drag, in steps of half the eraser so fast moves don't skip strokes
+            last_x, last_y = touch.ud["eraser"]
+            steps = max(1, int(math.hypot(local_x - last_x, local_y - last_y) / (self.eraser_size / 4)))
+            for step in range(1, steps + 1):
+                self.erase_at(last_x + (local_x - last_x) * step / steps, last_y + (local_y - last_y) * step / steps,
+                              touch.ud["edit"])
+            touch.ud["eraser"] = (local_x, local_y)
         else:
             super().on_touch_move(touch)
 
     def on_touch_up(self, touch):
         # Remove the eraser indicator when the touch ends
         if self.eraser_indicator:
+            self.canvas.remove(self.eraser_indicator_color)
             self.canvas.remove(self.eraser_indicator)
             self.eraser_indicator = None  # Reset the eraser indicator
 
+        # A finished stroke joins the baked layer
+        stroke = touch.ud.pop("stroke", None)
+        if stroke is not None:
+            self.bake_stroke(stroke)
+
+        # Record the eraser gesture if it changed anything
+        if touch.ud.get("edit"):
+            self.history.push(touch.ud.pop("edit"))
+
         super().on_touch_up(touch)
 
+    def add_stroke(self, points, color, width, pain_level, index=None, live=False):
+        """Create a stroke, draw it and register it with the eraser grid."""
+        stroke = Stroke(points, color, width, pain_level, next(self._stroke_ids))
+        self.attach_stroke(stroke, index, live)
+        return stroke
+
+    def attach_stroke(self, stroke, index=None, live=False):
+        """Put a stroke (new, or taken off before) on the canvas and into self.strokes.
+
+        The stroke goes on top, or at ``index`` in the drawing order. A ``live`` stroke,
+        one still being drawn, is kept out of the baked layer until ``bake_stroke``.
+        """
+        if stroke.group is None:
+            stroke.group = InstructionGroup()
+            stroke.group.add(Color(*stroke.color))
+            stroke.line = ChunkedLine(stroke.points, width=stroke.width)
+            stroke.group.add(stroke.line)
+        if index is None or index >= len(self.strokes):
+            stroke.order = self.strokes[-1].order + 1 if self.strokes else 0.0
+            self.strokes.append(stroke)
+        else:
+            stroke.order = self._order_before(index)
+            self.strokes.insert(index, stroke)
+        self.strokes_by_id[stroke.id] = stroke
+        if live:
+            self.live_layer.add(stroke.group)
+        else:
+            self._bake_group(stroke.group, index)
+        self.grid.add(stroke.id, stroke.points)
+        self.coverage.add(stroke.id, stroke)
+
+    def _order_before(self, index):
+        """Sort key between the strokes at ``index - 1`` and ``index``."""
+        after = self.strokes[index].order
+        before = self.strokes[index - 1].order if index > 0 else after - 2
+        order = (before + after) / 2
+        if not before < order < after:
+            # Out of float precision after many splits at the same place: renumber
+            for i, stroke in enumerate(self.strokes):
+                stroke.order = float(i)
+            return self._order_before(index)
+        return order
+
+    def stroke_index(self, stroke):
+        """Index of a stroke in self.strokes, found by its sort key."""
+        if self.strokes and self.strokes[-1] is stroke:
+            return len(self.strokes) - 1
+        return bisect.bisect_left(self.strokes, stroke.order, key=stroke_order)
+
+    def _bake_group(self, group, index):
+        # Live strokes are the last ones, so indices into the baked layer match self.strokes
+        if index is None or index >= len(self.stroke_layer.children):
+            self.stroke_layer.add(group)
+        else:
+            self.stroke_layer.insert(index, group)
+
+    def bake_stroke(self, stroke):
+        """Move a finished live stroke into the baked layer."""
+        if stroke.group not in self.live_layer.children:
+            return  # Undone or erased while being drawn
+        self.live_layer.remove(stroke.group)
+        if self.strokes_by_id.get(stroke.id) is not stroke:
+            return  # No longer part of the drawing
+        self._bake_group(stroke.group, self.stroke_index(stroke))
+
+    def detach_stroke(self, stroke):
+        """Take a stroke off the canvas and out of self.strokes; returns its index."""
+        index = self.stroke_index(stroke)
+        del self.strokes[index]
+        del self.strokes_by_id[stroke.id]
+        if stroke.group in self.live_layer.children:
+            self.live_layer.remove(stroke.group)
+        else:
+            self.stroke_layer.remove(stroke.group)
+        self.grid.remove(stroke.id)
+        self.coverage.remove(stroke.id)
+        return index
+
+    def empty_drawing(self):
+        """Return a new, empty drawing state for swap_drawing."""
+        return [], {}, InstructionGroup(), StrokeGrid(self.grid.cell_size), PainCoverage(self.coverage.cell_size)
+
+    def swap_drawing(self, drawing):
+        """Replace the strokes, their canvas layer, grid and coverage at once; returns the previous ones."""
+        previous = (self.strokes, self.strokes_by_id, self.stroke_layer, self.grid, self.coverage)
+        self.strokes, self.strokes_by_id, layer, self.grid, self.coverage = drawing
+        self.stroke_fbo.insert(self.stroke_fbo.indexof(self.stroke_layer), layer)
+        self.stroke_fbo.remove(self.stroke_layer)
+        self.stroke_layer = layer
+        return previous
+
+    def erase_at(self, x, y, edit=None):
+        """Cut the parts of the strokes under the eraser centered at (x, y).
+
+        The changes are recorded in ``edit``, or as a command of their own.
+        """
+        radius = self.eraser_size / 2
+        hits = self.grid.query(x, y, radius)
+        if not hits:
+            return
+
+        command = edit if edit is not None else EditCommand()
+        # Only the hit strokes are looked at, in drawing order
+        for stroke in sorted((self.strokes_by_id[key] for key in hits), key=stroke_order):
+            pieces = split_outside_circle(stroke.points, x, y, radius)
+            index = self.detach_stroke(stroke)
+            command.remove(stroke, index)
+            # The pieces keep the stroke's place in the drawing order
+            for offset, piece in enumerate(pieces):
+                self.add_stroke(piece, stroke.color, stroke.width, stroke.pain_level, index + offset)
+                command.add(self.strokes[index + offset], index + offset)
+        if edit is None:
+            self.history.push(command)
+
     def toggle_eraser_mode(self):
         """Method to toggle between move and draw modes"""
         self.eraser_enabled = not self.eraser_enabled
 
     def clear_canvas(self):
-
-        for i in range(len(self.lines)):
-            last_line = self.lines.pop()
-            self.undo_stack.append(last_line)
-            self.canvas.remove(last_line['line'])
-
-            last_color = self.colors.pop()
-            self.undo_color_stack.append(last_color)
-
+        """Remove every stroke, as one command: the drawing is swapped for an empty one."""
+        if not self.strokes:
+            return
+        nbytes = sum(stroke.nbytes for stroke in self.strokes)
+        # Strokes still being drawn are baked with the rest, so undoing the clear shows them again
+        for stroke in [stroke for stroke in self.strokes if stroke.group in self.live_layer.children]:
+            self.bake_stroke(stroke)
+        previous = self.swap_drawing(self.empty_drawing())
+        self.history.push(SwapCommand(previous, nbytes))
 
     def undo(self):
-        if self.lines:
-            last_line = self.lines.pop()
-            self.undo_stack.append(last_line)
-            self.canvas.remove(last_line['line'])
-
-        if self.colors:
-            last_color = self.colors.pop()
-            self.undo_color_stack.append(last_color)
-
+        self.history.undo(self)
 
     def redo(self):
-        if self.undo_stack:
-            last_undone_line = self.undo_stack.pop()
-            self.lines.append(last_undone_line)
-
-            last_undone_color = self.undo_color_stack.pop()
-            self.colors.append(last_undone_color)
-
-            with self.canvas:
-                Color(*last_undone_color)
-                self.canvas.add(last_undone_line['line'])
+        self.history.redo(self)
+
+    def get_strokes(self):
+        """Return a copy of the points, color, line width and pain level of every stroke."""
+        return [stroke.to_dict() for stroke in self.strokes]
+
+    def augmented_strokes(self, rng=random, **kwargs):
+        """Return an augmented copy of the strokes (see stroke_aug.augment_strokes)."""
+        return augment_strokes(self.get_strokes(), self.size, rng, **kwargs)
+
+    def rasterize(self, strokes=None, output_size=None):
+        """Draw the strokes (or the given stroke data) into a PIL image, without the template."""
+        return rasterize_strokes(self.get_strokes() if strokes is None else strokes, self.size, output_size)
+
+    def template_frame(self):
+        """Return the (x, y, width, height) of the drawn body template, in local coordinates."""
+        if self.template_tiles is not None:
+            # Fitted and centered, like an Image with keep_ratio
+            width, height = self.template_tiles.size
+            scale = min(self.width / width, self.height / height)
+            return ((self.width - width * scale) / 2, (self.height - height * scale) / 2,
+                    width * scale, height * scale)
+        image = self.background_image
+        width, height = image.norm_image_size
+        return image.center_x - width / 2, image.center_y - height / 2, width, height
+
+    def save_strokes(self, file_path):
+        """Write the strokes to a compact vector file (see stroke_io)."""
+        save_strokes(file_path, self.strokes, self.size, self.template_frame())
+
+    def load_strokes(self, file_path):
+        """Replace the drawing with the strokes of a vector file, fitted to the current template."""
+        strokes, _, frame = read_strokes(file_path)
+        self.swap_drawing(self.empty_drawing())
+        self.history.clear()
+        for stroke in map_strokes(strokes, frame, self.template_frame()):
+            stroke.id = next(self._stroke_ids)
+            self.attach_stroke(stroke)
+
+    def export_image(self, size=EXPORT_SIZE):
+        """Render the template and strokes off-screen at a fixed size, whatever the zoom.
+
+        Returns the RGBA pixels (top row first), which are also kept in export_pixels
+        for in-app analysis.
+        """
+        template = self.template_tiles if self.template_tiles is not None else self.background_image.texture
+        self.export_pixels = render_strokes(self.strokes, self.template_frame(), size, template)
+        self.export_size = tuple(size)
+        return self.export_pixels
+
+    def coverage_summary(self):
+        """Painted area and coverage of the template per pain level (see coverage.PainCoverage)."""
+        _, _, width, height = self.template_frame()
+        return self.coverage.summary(width * height)
+
+    def save_coverage(self, file_path):
+        """Write the coverage summary as JSON."""
+        with open(file_path, "w") as f:
+            json.dump(self.coverage_summary(), f, indent=2)
+
+    def region_summary(self):
+        """Stroke length and pain levels per body region, or None without a region map."""
+        if self.regions is None:
+            return None
+        return self.regions.summarize(self.strokes, self.template_frame())
+
+    def save_regions(self, file_path):
+        """Write the region summary as JSON; returns False without a region map."""
+        regions = self.region_summary()
+        if regions is None:
+            return False
+        with open(file_path, "w") as f:
+            json.dump(regions, f, indent=2, ensure_ascii=False)
+        return True
 
-    def save_canvas(self, file_path):
-        # Reset the scale and position to default
-        self.scale = 1.0
-        self.pos = (0, 0)  # or adjust as necessary based on your layout
+    def save_canvas(self, file_path, callback=None, size=EXPORT_SIZE):
+        """Export the drawing and write it as a PNG on a worker thread.
 
-        # Force a layout update
-        self.canvas.ask_update()  # Update the canvas
-        Clock.schedule_once(lambda dt: self.export_to_png(file_path), 0.1)
+        callback(file_path, error) is called once the file is written (error is None)
+        or writing failed.
+        """
+        pixels = self.export_image(size)
+        return write_png_async(file_path, pixels, self.export_size, callback)
 
 
 
@@ -242,6 +541,12 @@ class MainLayout(BoxLayout):
         self.draw_widget = DrawWidget()
         top_layout.add_widget(self.draw_widget)
 
+        # Performance overlay for debugging, in the top left corner of the drawing area
+        self.top_layout = top_layout
+        self.hud = PerfHud(self.draw_widget, pos_hint={'x': 0, 'top': 1})
+        if hud_enabled_by_env():
+            self.toggle_hud()
+
         # Introduce sliders
 
         # slider for pencil level
@@ -294,7 +599,11 @@ class MainLayout(BoxLayout):
         middle_pain_slider_nested_layout_2 = BoxLayout(orientation="horizontal")
         middle_pain_slider_nested_layout_3 = BoxLayout(orientation="horizontal")
 
-        middle_pain_slider_nested_layout_1.add_widget(Label(text="Schmerzniveau", color=(0, 0, 0, 1)))
+        # A triple tap on the caption shows the performance overlay
+        pain_caption = Label(text="Schmerzniveau", color=(0, 0, 0, 1))
+        pain_caption.bind(on_touch_down=lambda widget, touch: (
+            widget.collide_point(*touch.pos) and touch.is_triple_tap and self.toggle_hud()))
+        middle_pain_slider_nested_layout_1.add_widget(pain_caption)
         middle_pain_slider_nested_layout_2.add_widget(self.pain_slider)
         middle_pain_slider_nested_layout_3.add_widget(self.pain_value_label)
 
@@ -387,21 +696,11 @@ class MainLayout(BoxLayout):
 
     def set_pain_color(self, value):
         """Update the pencil color and slider track color based on the pain slider value."""
-        color_values = [
-            (1, 1, 0, 1),  # yellow
-            (1, 0.9, 0, 1),
-            (1, 0.8, 0, 1),
-            (1, 0.7, 0, 1),
-            (1, 0.6, 0, 1),
-            (1, 0.5, 0, 1),
-            (1, 0.4, 0, 1),
-            (1, 0.3, 0, 1),
-            (1, 0.2, 0, 1),
-            (1, 0, 0, 1),  # red
-        ]
+        color_values = PAIN_COLORS
         # Calculate the index for the color based on the slider value
         index = int(value) - 1
         self.draw_widget.color = color_values[index]
+        self.draw_widget.pain_level = index + 1
         self.pain_slider.value_track_color = color_values[index]
 
     def toggle_eraser_mode(self, instance):
@@ -412,6 +711,16 @@ class MainLayout(BoxLayout):
         else:
             self.eraser_button.background_color = (1, 1, 1, 1)  # White for draw mode
 
+    def toggle_hud(self):
+        """Show or hide the performance overlay."""
+        if self.hud.running:
+            self.hud.stop()
+            self.top_layout.remove_widget(self.hud)
+        else:
+            self.top_layout.add_widget(self.hud)
+            self.hud.start()
+        return True
+
     def show_help(self, instance):
         popup_layout = BoxLayout(orientation='vertical')
         popup_layout.add_widget(
@@ -448,20 +757,40 @@ class MainLayout(BoxLayout):
                 save_path = os.path.join(os.getcwd(), f'{file_name}.png')
 
             try:
-                # Save the canvas after resetting the zoom
-                self.draw_widget.save_canvas(save_path)
-                print(f"Image saved successfully at: {save_path}")
-
-                # Show success message in German
-                self.show_success_popup("Bild erfolgreich gespeichert!", "Schließen")
-
-                # Close the popup
-                self.save_popup.dismiss()
+                # Keep the strokes themselves next to the image
+                strokes_path = os.path.splitext(save_path)[0] + STROKE_EXTENSION
+                self.draw_widget.save_strokes(strokes_path)
+                print(f"Strokes saved successfully at: {strokes_path}")
+
+                # And the painted area per pain level
+                coverage_path = os.path.splitext(save_path)[0] + '_coverage.json'
+                self.draw_widget.save_coverage(coverage_path)
+                print(f"Coverage saved successfully at: {coverage_path}")
+
+                # And the body regions the strokes touch, if the region map was built
+                regions_path = os.path.splitext(save_path)[0] + '_regions.json'
+                if self.draw_widget.save_regions(regions_path):
+                    print(f"Regions saved successfully at: {regions_path}")
+
+                # The PNG is written in the background; report once it exists
+                self.draw_widget.save_canvas(save_path, callback=self.on_canvas_saved)
             except Exception as e:
                 print(f"Error saving image: {str(e)}")
         else:
             print("No file name provided.")
 
+    def on_canvas_saved(self, save_path, error):
+        if error is not None:
+            print(f"Error saving image: {str(error)}")
+            return
+        print(f"Image saved successfully at: {save_path}")
+
+        # Show success message in German
+        self.show_success_popup("Bild erfolgreich gespeichert!", "Schließen")
+
+        # Close the popup
+        self.save_popup.dismiss()
+
     def show_success_popup(self, message, button_text):
         content = BoxLayout(orientation='vertical')
         label = Label(text=message)
@@ -480,6 +809,12 @@ class MainLayout(BoxLayout):
 
 
 class SeePainPage(Screen):
+
+    @classmethod
+    def asset_paths(cls):
+        """Images the page loads, for preloading: the template, unless it is drawn from tiles."""
+        return [] if load_tile_index() else [TEMPLATE_PATH]
+
     def __init__(self, **kwargs):
         super(SeePainPage, self).__init__(**kwargs)
         with self.canvas.before:
@@ -0,0 +1,61 @@
+"""Compact model of one stroke of a pain drawing."""
+from array import array
+
+# Stroke color of every pain level, 1 (yellow) to 10 (red), as picked with the pain slider
+PAIN_COLORS = [
+    (1, 1, 0, 1),  # yellow
+    (1, 0.9, 0, 1),
+    (1, 0.8, 0, 1),
+    (1, 0.7, 0, 1),
+    (1, 0.6, 0, 1),
+    (1, 0.5, 0, 1),
+    (1, 0.4, 0, 1),
+    (1, 0.3, 0, 1),
+    (1, 0.2, 0, 1),
+    (1, 0, 0, 1),  # red
+]
+
+
+class Stroke:
+    """One stroke: its points plus the color, line width and pain level it was drawn with.
+
+    ``points`` is a flat ``array('f')`` of x, y pairs in the drawing widget's local
+    coordinates, so it takes 8 bytes per point and can be handed to export or
+    analysis code as a buffer without copying (``memoryview(stroke.points)`` or
+    ``numpy.frombuffer(stroke.points, numpy.float32)``). ``times`` holds, for every
+    point, the seconds since ``start_time`` (a Unix timestamp) at which it was drawn;
+    it is empty when the timing is unknown, e.g. for pieces left over by the eraser.
+    ``group`` and ``line`` hold the canvas instructions of the stroke while it is
+    drawn by a ``DrawWidget``, and ``order`` its sort key in the drawing order.
+    """
+
+    __slots__ = ('id', 'points', 'color', 'width', 'pain_level', 'times', 'start_time', 'group', 'line', 'order')
+
+    def __init__(self, points, color, width, pain_level, stroke_id=None, times=None, start_time=None):
+        self.id = stroke_id
+        self.points = points if isinstance(points, array) else array('f', points)
+        self.color = tuple(color)
+        self.width = width
+        self.pain_level = pain_level
+        self.times = times if isinstance(times, array) else array('f', times or ())
+        self.start_time = start_time
+        self.group = None
+        self.line = None
+        self.order = None
+
+    def __len__(self):
+        """Number of points of the stroke."""
+        return len(self.points) // 2
+
+    def __repr__(self):
+        return f"Stroke(id={self.id}, points={len(self)}, pain_level={self.pain_level}, width={self.width})"
+
+    @property
+    def nbytes(self):
+        """Size of the point and time buffers in bytes."""
+        return len(self.points) * self.points.itemsize + len(self.times) * self.times.itemsize
+
+    def to_dict(self):
+        """Return the stroke as the plain dict used by stroke_aug."""
+        return {'points': self.points.tolist(), 'color': self.color, 'width': self.width,
+                'pain_level': self.pain_level}
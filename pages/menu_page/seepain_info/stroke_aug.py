@@ -0,0 +1,102 @@
+"""Augmentation of pain drawings on their stroke data.
+
+Strokes are plain dicts as returned by ``DrawWidget.get_strokes()``:
+
+    {'points': [x0, y0, x1, y1, ...], 'color': (r, g, b, a), 'width': 10}
+
+with points in the drawing widget's local coordinates (origin bottom left, as in
+Kivy) and ``width`` the Kivy ``Line`` width. Transforming a few thousand points is
+far cheaper than resampling a full image, and the strokes stay crisp because they
+are only rasterized, at any size, when ``rasterize_strokes`` is called.
+
+This module only needs the standard library, so it can run inside the app; PIL is
+imported by ``rasterize_strokes`` only.
+"""
+import math
+import random
+
+# A Kivy Line of width w is drawn w pixels to each side of its points
+KIVY_LINE_THICKNESS = 2
+
+
+def augment_strokes(strokes, size, rng=random, max_angle=1.5, scale_range=(0.95, 1.05), jitter=0.5,
+                    warp=0.01):
+    """Return jittered, rotated, scaled and warped copies of ``strokes``.
+
+    ``size`` is the (width, height) of the drawing area; rotation and zoom happen
+    about its center, like ``augment_image`` in data_aug.py does for images.
+    ``max_angle`` is in degrees, ``jitter`` the standard deviation of the noise
+    added to every point in pixels, and ``warp`` the amplitude of a smooth sine
+    displacement field as a fraction of the drawing size. Line widths follow the zoom.
+    """
+    w, h = size
+    cx, cy = w / 2, h / 2
+
+    angle = math.radians(rng.uniform(-max_angle, max_angle))
+    scale = rng.uniform(*scale_range)
+    cos, sin = math.cos(angle) * scale, math.sin(angle) * scale
+
+    # One low-frequency wave per axis, so neighbouring points move together
+    amp_x, amp_y = warp * w, warp * h
+    freq_x, freq_y = rng.uniform(0.5, 1.5) * 2 * math.pi / h, rng.uniform(0.5, 1.5) * 2 * math.pi / w
+    phase_x, phase_y = rng.uniform(0, 2 * math.pi), rng.uniform(0, 2 * math.pi)
+
+    augmented = []
+    for stroke in strokes:
+        points = stroke['points']
+        new_points = []
+        for i in range(0, len(points) - 1, 2):
+            x, y = points[i], points[i + 1]
+
+            # Warp, then rotate and zoom about the center, then jitter
+            x += amp_x * math.sin(freq_x * y + phase_x)
+            y += amp_y * math.sin(freq_y * x + phase_y)
+            dx, dy = x - cx, y - cy
+            x = cx + cos * dx - sin * dy
+            y = cy + sin * dx + cos * dy
+            if jitter:
+                x += rng.gauss(0, jitter)
+                y += rng.gauss(0, jitter)
+            new_points.extend((x, y))
+
+        augmented.append(dict(stroke, points=new_points, width=stroke['width'] * scale))
+    return augmented
+
+
+def rasterize_strokes(strokes, size, output_size=None, background=None):
+    """Draw ``strokes`` into an RGBA PIL image.
+
+    ``size`` is the (width, height) of the drawing area the points live in and
+    ``output_size`` the size of the image (``size`` by default); the strokes are
+    scaled to fit. ``background`` is an optional PIL image drawn underneath,
+    resized to the output size.
+    """
+    from PIL import Image, ImageDraw
+
+    w, h = size
+    out_w, out_h = output_size or size
+    sx, sy = out_w / w, out_h / h
+
+    if background is not None:
+        image = background.convert("RGBA").resize((out_w, out_h))
+    else:
+        image = Image.new("RGBA", (out_w, out_h), (255, 255, 255, 0))
+    draw = ImageDraw.Draw(image)
+
+    for stroke in strokes:
+        points = stroke['points']
+        # Kivy's y axis points up, PIL's down
+        xy = [(points[i] * sx, out_h - points[i + 1] * sy) for i in range(0, len(points) - 1, 2)]
+        if len(xy) < 2:
+            # Kivy does not draw single-point lines either
+            continue
+
+        fill = tuple(int(round(c * 255)) for c in stroke['color'])
+        thickness = max(1, int(round(stroke['width'] * KIVY_LINE_THICKNESS * min(sx, sy))))
+        draw.line(xy, fill=fill, width=thickness, joint="curve")
+
+        # Round caps, as Kivy draws them
+        radius = thickness / 2
+        for x, y in (xy[0], xy[-1]):
+            draw.ellipse((x - radius, y - radius, x + radius, y + radius), fill=fill)
+    return image
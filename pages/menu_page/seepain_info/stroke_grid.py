@@ -0,0 +1,158 @@
+"""Uniform grid of stroke segments, used by the eraser for hit-testing.
+
+Every segment of every stroke is bucketed into the grid cells its bounding box
+covers, and the grid is updated as points are appended to a stroke. Finding the
+segments under the eraser then only looks at the few cells around it, however many
+strokes the drawing has.
+"""
+import math
+
+
+def segment_distance(px, py, x0, y0, x1, y1):
+    """Return the distance from point (px, py) to the segment (x0, y0)-(x1, y1)."""
+    dx, dy = x1 - x0, y1 - y0
+    length2 = dx * dx + dy * dy
+    if length2 == 0:
+        return math.hypot(px - x0, py - y0)
+    t = max(0.0, min(1.0, ((px - x0) * dx + (py - y0) * dy) / length2))
+    return math.hypot(px - (x0 + t * dx), py - (y0 + t * dy))
+
+
+def split_outside_circle(points, cx, cy, radius):
+    """Cut the part of a polyline that lies inside a circle.
+
+    ``points`` is a flat [x0, y0, x1, y1, ...] list. Returns the pieces of the
+    polyline outside the circle as flat lists; segments crossing the circle are cut
+    where they enter and leave it. Pieces of a single point are dropped.
+    """
+    r2 = radius * radius
+
+    def inside(x, y):
+        return (x - cx) ** 2 + (y - cy) ** 2 <= r2
+
+    pieces = []
+    current = []
+    count = len(points) // 2
+    if count == 1:
+        return [] if inside(points[0], points[1]) else [list(points)]
+
+    for i in range(count - 1):
+        x0, y0, x1, y1 = points[2 * i], points[2 * i + 1], points[2 * i + 2], points[2 * i + 3]
+        if not current and not inside(x0, y0):
+            current = [x0, y0]
+
+        # Parameters where the segment crosses the circle: |p0 + t * d - c| = r
+        dx, dy = x1 - x0, y1 - y0
+        fx, fy = x0 - cx, y0 - cy
+        a = dx * dx + dy * dy
+        b = 2 * (fx * dx + fy * dy)
+        c = fx * fx + fy * fy - r2
+        disc = b * b - 4 * a * c
+        if a == 0 or disc <= 0:
+            t_in, t_out = 2.0, 2.0  # Does not cross
+        else:
+            root = math.sqrt(disc)
+            t_in, t_out = (-b - root) / (2 * a), (-b + root) / (2 * a)
+
+        if t_in >= 1 or t_out <= 0:
+            # Entirely outside, or entirely inside the circle
+            if inside(x0, y0) and inside(x1, y1):
+                continue
+            current = current or [x0, y0]
+            current.extend((x1, y1))
+            continue
+
+        if t_in > 0:
+            # Leaves the kept part where it enters the circle
+            current.extend((x0 + t_in * dx, y0 + t_in * dy))
+        if len(current) >= 4:
+            pieces.append(current)
+        current = []
+        if t_out < 1:
+            current = [x0 + t_out * dx, y0 + t_out * dy, x1, y1]
+
+    if len(current) >= 4:
+        pieces.append(current)
+    return pieces
+
+
+class StrokeGrid:
+    """Bucket stroke segments into square cells of ``cell_size`` pixels.
+
+    Strokes are registered with a hashable key and their flat point list, which the
+    grid keeps a reference to; call ``update`` after appending points to index the
+    new segments.
+    """
+
+    def __init__(self, cell_size=50):
+        self.cell_size = cell_size
+        self.cells = {}  # (col, row) -> set of (key, segment index)
+        self.points = {}  # key -> flat point list of the stroke
+        self.indexed = {}  # key -> number of points already indexed
+        self.cells_of = {}  # key -> cells holding a segment of the stroke
+
+    def __len__(self):
+        return len(self.points)
+
+    def _cell_range(self, x0, y0, x1, y1):
+        size = self.cell_size
+        for col in range(int(math.floor(min(x0, x1) / size)), int(math.floor(max(x0, x1) / size)) + 1):
+            for row in range(int(math.floor(min(y0, y1) / size)), int(math.floor(max(y0, y1) / size)) + 1):
+                yield col, row
+
+    def _add_segment(self, key, index, x0, y0, x1, y1):
+        cells_of = self.cells_of[key]
+        for cell in self._cell_range(x0, y0, x1, y1):
+            self.cells.setdefault(cell, set()).add((key, index))
+            cells_of.add(cell)
+
+    def add(self, key, points):
+        """Register a stroke and index all of its segments."""
+        self.points[key] = points
+        self.indexed[key] = 0
+        self.cells_of[key] = set()
+        self.update(key)
+
+    def update(self, key):
+        """Index the segments added to a stroke since the last call.
+
+        The last segment is always indexed again, as the last point of a stroke being
+        drawn may have moved. Cells it has left keep a stale entry, which ``query``
+        filters out by distance.
+        """
+        points = self.points[key]
+        count = len(points) // 2
+        start = self.indexed[key]
+        if count == 1 and start == 0:
+            # A lone point is indexed as a zero-length segment
+            self._add_segment(key, 0, points[0], points[1], points[0], points[1])
+        for i in range(max(start - 2, 0), count - 1):
+            self._add_segment(key, i, points[2 * i], points[2 * i + 1], points[2 * i + 2], points[2 * i + 3])
+        self.indexed[key] = count
+
+    def remove(self, key):
+        """Forget a stroke."""
+        for cell in self.cells_of.pop(key, ()):
+            entries = self.cells[cell]
+            for entry in [entry for entry in entries if entry[0] == key]:
+                entries.discard(entry)
+            if not entries:
+                del self.cells[cell]
+        self.points.pop(key, None)
+        self.indexed.pop(key, None)
+
+    def query(self, x, y, radius):
+        """Return the keys of the strokes with a segment within ``radius`` of (x, y)."""
+        hits = set()
+        for cell in self._cell_range(x - radius, y - radius, x + radius, y + radius):
+            for key, i in self.cells.get(cell, ()):
+                if key in hits:
+                    continue
+                points = self.points[key]
+                if len(points) >= 2 * i + 4:
+                    x0, y0, x1, y1 = points[2 * i:2 * i + 4]
+                else:
+                    x0, y0 = x1, y1 = points[2 * i], points[2 * i + 1]
+                if segment_distance(x, y, x0, y0, x1, y1) <= radius:
+                    hits.add(key)
+        return hits
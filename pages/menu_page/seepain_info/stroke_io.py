@@ -0,0 +1,167 @@
+"""Compact binary vector format for the strokes of a pain drawing (``.spd`` files).
+
+Layout, after the 4-byte magic ``SPD1``: one zlib-compressed payload holding
+
+* a header: canvas size and template frame (x, y, width, height) in the drawing
+  widget's local coordinates, as little-endian float32, then the stroke count;
+* per stroke: RGBA color (4 bytes), line width (float32), pain level (uint8),
+  start time (float64, Unix time), point count, time count (0 or the point count),
+  the points and the point times.
+
+Coordinates are quantized to 1/``QUANTIZATION`` pixel and stored, like the point
+times (in milliseconds), as zigzag varint deltas from the previous value, so a
+typical stroke takes one or two bytes per coordinate before compression. The
+format only needs the standard library.
+"""
+import struct
+import zlib
+from array import array
+
+from .stroke import Stroke
+
+MAGIC = b"SPD1"
+
+EXTENSION = ".spd"
+
+# Coordinates are stored in steps of 1 / QUANTIZATION pixel
+QUANTIZATION = 8
+
+_HEADER = struct.Struct("<6f")
+_STROKE = struct.Struct("<4BfBd")
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _zigzag(value):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value):
+    return value >> 1 if not value & 1 else -(value >> 1) - 1
+
+
+def _write_deltas(out, values, step):
+    previous = 0
+    for value in values:
+        quantized = int(round(value * step))
+        _write_varint(out, _zigzag(quantized - previous))
+        previous = quantized
+
+
+def _read_deltas(data, pos, count, step, stride=1):
+    """Read ``count`` delta-coded values, interleaved as ``stride`` independent series."""
+    values = array('f', bytes(4 * count))
+    previous = [0] * stride
+    for i in range(count):
+        delta, pos = _read_varint(data, pos)
+        previous[i % stride] += _unzigzag(delta)
+        values[i] = previous[i % stride] / step
+    return values, pos
+
+
+def _write_points(out, points):
+    # x and y are delta-coded separately: consecutive points are close together
+    previous_x = previous_y = 0
+    for i in range(0, len(points) - 1, 2):
+        x, y = int(round(points[i] * QUANTIZATION)), int(round(points[i + 1] * QUANTIZATION))
+        _write_varint(out, _zigzag(x - previous_x))
+        _write_varint(out, _zigzag(y - previous_y))
+        previous_x, previous_y = x, y
+
+
+def dump_strokes(strokes, canvas_size, frame=None):
+    """Encode ``Stroke`` objects into the ``.spd`` binary format.
+
+    ``canvas_size`` is the size of the drawing widget and ``frame`` the (x, y, width,
+    height) of the body template within it (the whole canvas by default), so the
+    strokes can be mapped onto a canvas of another size when they are loaded.
+    """
+    frame = frame or (0, 0, canvas_size[0], canvas_size[1])
+    out = bytearray(_HEADER.pack(*canvas_size, *frame))
+    _write_varint(out, len(strokes))
+
+    for stroke in strokes:
+        rgba = [max(0, min(255, int(round(c * 255)))) for c in stroke.color]
+        out += _STROKE.pack(*rgba, stroke.width, stroke.pain_level, stroke.start_time or 0.0)
+        count = len(stroke.points) // 2
+        times = stroke.times if len(stroke.times) == count else ()
+        _write_varint(out, count)
+        _write_varint(out, len(times))
+        _write_points(out, stroke.points)
+        _write_deltas(out, times, 1000)
+
+    return MAGIC + zlib.compress(bytes(out), 9)
+
+
+def load_strokes(data):
+    """Decode ``.spd`` data; returns ``(strokes, canvas_size, frame)``."""
+    if data[:4] != MAGIC:
+        raise ValueError("Not a SeePain stroke file")
+    data = zlib.decompress(data[4:])
+
+    values = _HEADER.unpack_from(data, 0)
+    canvas_size, frame = values[:2], values[2:]
+    count, pos = _read_varint(data, _HEADER.size)
+
+    strokes = []
+    for _ in range(count):
+        r, g, b, a, width, pain_level, start_time = _STROKE.unpack_from(data, pos)
+        pos += _STROKE.size
+        point_count, pos = _read_varint(data, pos)
+        time_count, pos = _read_varint(data, pos)
+        points, pos = _read_deltas(data, pos, 2 * point_count, QUANTIZATION, stride=2)
+        times, pos = _read_deltas(data, pos, time_count, 1000)
+        strokes.append(Stroke(points, (r / 255, g / 255, b / 255, a / 255), width, pain_level,
+                              times=times, start_time=start_time or None))
+    return strokes, canvas_size, frame
+
+
+def save_strokes(path, strokes, canvas_size, frame=None):
+    """Write strokes to a ``.spd`` file."""
+    with open(path, "wb") as f:
+        f.write(dump_strokes(strokes, canvas_size, frame))
+
+
+def read_strokes(path):
+    """Read a ``.spd`` file; returns ``(strokes, canvas_size, frame)``."""
+    with open(path, "rb") as f:
+        return load_strokes(f.read())
+
+
+def fit_frame(frame, size):
+    """Return the (x, y, scale) placing ``frame`` centered in ``size``, keeping its aspect ratio."""
+    _, _, width, height = frame
+    scale = min(size[0] / width, size[1] / height)
+    return (size[0] - width * scale) / 2, (size[1] - height * scale) / 2, scale
+
+
+def map_strokes(strokes, frame, target_frame):
+    """Map strokes from one template frame onto another, scaling the line widths."""
+    x0, y0, w0, h0 = frame
+    x1, y1, w1, h1 = target_frame
+    sx, sy = w1 / w0, h1 / h0
+    mapped = []
+    for stroke in strokes:
+        points = array('f', stroke.points)
+        for i in range(0, len(points) - 1, 2):
+            points[i] = x1 + (points[i] - x0) * sx
+            points[i + 1] = y1 + (points[i + 1] - y0) * sy
+        mapped.append(Stroke(points, stroke.color, stroke.width * min(sx, sy), stroke.pain_level,
+                             times=stroke.times, start_time=stroke.start_time))
+    return mapped
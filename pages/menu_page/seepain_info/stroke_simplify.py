@@ -0,0 +1,88 @@
+"""Online simplification of a stroke while it is being drawn.
+
+A sleeve (cone intersection) filter: starting from the last kept point, every new
+touch sample narrows the cone of directions in which the stroke can continue while
+staying within ``tolerance`` of a straight segment. As long as the samples stay in
+the cone, only the last vertex of the stroke is moved; once a sample leaves it, the
+previous sample is kept as a vertex. Every dropped sample therefore lies within
+``tolerance`` of the simplified stroke, each sample costs O(1), and long straight
+or slowly curving strokes keep very few vertices.
+"""
+import math
+
+# Tolerance as a fraction of the line width: a Kivy line is 2 * width wide, so this
+# stays well inside the drawn stroke
+TOLERANCE_FACTOR = 0.25
+
+# Below this tolerance (in pixels) simplification would only drop duplicate samples
+MIN_TOLERANCE = 0.5
+
+
+def _wrap(angle):
+    """Wrap an angle into [-pi, pi)."""
+    return (angle + math.pi) % (2 * math.pi) - math.pi
+
+
+class StrokeSimplifier:
+    """Decide, sample by sample, whether to append a vertex or move the last one."""
+
+    APPEND = 1  # Keep the previous last vertex and append the new sample
+    REPLACE = 2  # Move the last vertex to the new sample
+
+    def __init__(self, x, y, tolerance):
+        self.tolerance = tolerance
+        self.anchor = (x, y)  # Last vertex that can no longer move
+        self.has_tail = False  # Whether the stroke has a movable last vertex
+        self.tail = (x, y)
+        self.center = None  # Direction of the cone from the anchor
+        self.low = self.high = 0.0  # Cone limits, relative to center
+        self.reach = 0.0  # Farthest distance from the anchor so far
+
+    @classmethod
+    def for_width(cls, x, y, line_width, factor=TOLERANCE_FACTOR):
+        """Create a simplifier whose tolerance follows the line width."""
+        return cls(x, y, max(MIN_TOLERANCE, factor * line_width))
+
+    def _start_cone(self, x, y):
+        ax, ay = self.anchor
+        distance = math.hypot(x - ax, y - ay)
+        self.reach = distance
+        if distance <= self.tolerance:
+            # Too close to the anchor to tell a direction yet
+            self.center = None
+            return
+        self.center = math.atan2(y - ay, x - ax)
+        half = math.asin(self.tolerance / distance)
+        self.low, self.high = -half, half
+
+    def add(self, x, y):
+        """Feed a new sample; returns APPEND or REPLACE for the stroke's vertices."""
+        if not self.has_tail:
+            self.has_tail = True
+            self.tail = (x, y)
+            self._start_cone(x, y)
+            return self.APPEND
+
+        if self.center is None:
+            # Still next to the anchor: any direction fits
+            self._start_cone(x, y)
+            self.tail = (x, y)
+            return self.REPLACE
+
+        ax, ay = self.anchor
+        distance = math.hypot(x - ax, y - ay)
+        angle = _wrap(math.atan2(y - ay, x - ax) - self.center)
+        if self.low <= angle <= self.high and distance >= self.reach:
+            # Still within tolerance of one straight segment: narrow the cone
+            half = math.asin(self.tolerance / distance)
+            self.low = max(self.low, angle - half)
+            self.high = min(self.high, angle + half)
+            self.reach = max(self.reach, distance)
+            self.tail = (x, y)
+            return self.REPLACE
+
+        # The stroke turned or went back: keep the previous sample and start a new cone from it
+        self.anchor = self.tail
+        self.tail = (x, y)
+        self._start_cone(x, y)
+        return self.APPEND
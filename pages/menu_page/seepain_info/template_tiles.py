@@ -0,0 +1,136 @@
+"""Multi-resolution rendering of the human template from a tile pyramid.
+
+``build_template_tiles.py`` cuts the template into a pyramid: level 0 is the full
+resolution and every next level halves it, down to a level that fits one tile.
+Levels are split into square tiles of ``tile_size`` pixels and described by an
+``index.json``:
+
+    {"width": ..., "height": ..., "tile_size": 256,
+     "levels": [{"width": ..., "height": ..., "cols": ..., "rows": ...}, ...]}
+
+``TiledTemplate`` draws the coarsest level underneath as a placeholder, and on top
+only the tiles of the level matching the current zoom that are on screen. Tile
+textures are cached with a least-recently-used limit, so zooming into a hand
+stays sharp without keeping the full-size template in texture memory.
+"""
+import json
+import math
+import os
+from collections import OrderedDict
+
+from kivy.core.image import Image as CoreImage
+from kivy.graphics import Color, Rectangle, InstructionGroup
+
+# Folder of the template's tile pyramid, built by build_template_tiles.py
+TILES_PATH = 'pages/menu_page/seepain_info/template_tiles'
+
+# Tile textures kept in memory
+MAX_TEXTURES = 48
+
+
+def load_tile_index(path=TILES_PATH):
+    """Read the index of a tile pyramid; None if it has not been built."""
+    index_path = os.path.join(path, 'index.json')
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path) as f:
+        return json.load(f)
+
+
+def tile_path(path, level, col, row):
+    return os.path.join(path, str(level), f'{col}_{row}.png')
+
+
+class TiledTemplate(InstructionGroup):
+    """Canvas instructions drawing the template from its tile pyramid."""
+
+    def __init__(self, path=TILES_PATH, index=None, max_textures=MAX_TEXTURES, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.index = index or load_tile_index(path)
+        self.max_textures = max_textures
+        self.textures = OrderedDict()  # (level, col, row) -> texture, least recently used first
+        self.frame = None
+        self.shown = None  # Level and tiles currently drawn on top of the placeholder
+
+        self.base = InstructionGroup()  # Coarsest level, always drawn
+        self.detail = InstructionGroup()  # Visible tiles of the level matching the zoom
+        self.add(Color(1, 1, 1, 1))
+        self.add(self.base)
+        self.add(self.detail)
+
+    @property
+    def size(self):
+        """Size of the template at full resolution."""
+        return self.index['width'], self.index['height']
+
+    def texture(self, level, col, row):
+        key = (level, col, row)
+        texture = self.textures.pop(key, None)
+        if texture is None:
+            texture = CoreImage(tile_path(self.path, level, col, row)).texture
+        self.textures[key] = texture
+        while len(self.textures) > self.max_textures:
+            self.textures.popitem(last=False)
+        return texture
+
+    def level_for(self, pixel_width):
+        """Coarsest level with at least one template pixel per screen pixel."""
+        last = len(self.index['levels']) - 1
+        if pixel_width <= 0:
+            return last
+        return max(0, min(last, int(math.floor(math.log2(self.index['width'] / pixel_width)))))
+
+    def _tiles(self, level, frame, visible=None):
+        """Yield (col, row, pos, size) of the tiles of a level, in local coordinates.
+
+        ``visible`` is an (x0, y0, x1, y1) rectangle; tiles outside of it are skipped.
+        """
+        info = self.index['levels'][level]
+        tile = self.index['tile_size']
+        fx, fy, fw, fh = frame
+        sx, sy = fw / info['width'], fh / info['height']
+        cols, rows = range(info['cols']), range(info['rows'])
+        if visible is not None:
+            # Tile rows count from the top of the template, local y from the bottom
+            x0, y0, x1, y1 = visible
+            cols = range(max(0, int((x0 - fx) / sx // tile)), min(info['cols'], int((x1 - fx) / sx // tile) + 1))
+            rows = range(max(0, int((fy + fh - y1) / sy // tile)),
+                         min(info['rows'], int((fy + fh - y0) / sy // tile) + 1))
+        for row in rows:
+            for col in cols:
+                width = min(tile, info['width'] - col * tile)
+                height = min(tile, info['height'] - row * tile)
+                pos = (fx + col * tile * sx, fy + fh - (row * tile + height) * sy)
+                yield col, row, pos, (width * sx, height * sy)
+
+    def draw(self, frame, pixel_width, visible=None):
+        """Add the tiles of the level matching ``pixel_width`` to the current canvas context.
+
+        ``frame`` is the (x, y, width, height) the template is drawn in and
+        ``pixel_width`` its width in screen (or output) pixels.
+        """
+        level = self.level_for(pixel_width)
+        for col, row, pos, size in self._tiles(level, frame, visible):
+            Rectangle(texture=self.texture(level, col, row), pos=pos, size=size)
+
+    def update(self, frame, pixel_width, visible):
+        """Show the template in ``frame``, with the tiles within ``visible`` at the matching level."""
+        if frame != self.frame:
+            self.frame = frame
+            self.base.clear()
+            last = len(self.index['levels']) - 1
+            for col, row, pos, size in self._tiles(last, frame):
+                self.base.add(Rectangle(texture=self.texture(last, col, row), pos=pos, size=size))
+
+        level = self.level_for(pixel_width)
+        tiles = [(col, row, pos, size) for col, row, pos, size in self._tiles(level, frame, visible)]
+        shown = (level, frame, tuple((col, row) for col, row, _, _ in tiles))
+        if shown == self.shown:
+            return
+        self.shown = shown
+        self.detail.clear()
+        if level == len(self.index['levels']) - 1:
+            return  # The placeholder already is this level
+        for col, row, pos, size in tiles:
+            self.detail.add(Rectangle(texture=self.texture(level, col, row), pos=pos, size=size))
@@ -0,0 +1,120 @@
+"""Timing of the app start-up, written as a structured log.
+
+Imported by ``main.py`` before Kivy, so it does not import Kivy itself at module
+level. Phases (imports, window creation, building each screen, decoding each
+image) are recorded with ``timed`` or ``record``; once the first frame is on
+screen ``first_frame`` writes them to ``startup_timing.jsonl`` in the app's
+user data directory, one JSON object per line:
+
+    {"event": "startup", "time": ..., "platform": ..., "process_age": ...,
+     "time_to_first_frame": ..., "phases": [{"phase": ..., "start": ..., "duration": ...}, ...]}
+
+Phases finishing after the first frame (screens built on first use, images
+decoded in the background) follow as ``{"event": "phase", ...}`` lines. Times are
+in seconds; ``start`` counts from the import of this module, and ``process_age``
+is how long the process had been running by then (interpreter start and the
+Android bootstrap), or null where /proc is not available.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+LOG_NAME = 'startup_timing.jsonl'
+
+# Size at which the log is moved to <name>.old and a new one is started
+MAX_LOG_BYTES = 1 << 20
+
+_start = time.perf_counter()
+_lock = threading.Lock()
+_phases = []  # Phases recorded before the first frame
+_log_path = None  # Set once the startup report was written; later phases are appended
+
+
+def process_age():
+    """Seconds the process has been running, from /proc; None if unavailable."""
+    try:
+        with open('/proc/self/stat') as f:
+            # Fields after the command name, which may contain spaces
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return uptime - int(fields[19]) / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+_process_age = process_age()
+
+
+def now():
+    """Seconds since the import of this module."""
+    return time.perf_counter() - _start
+
+
+def record(phase, start, duration):
+    """Record a phase that began ``start`` seconds after import; safe from any thread."""
+    entry = {'phase': phase, 'start': round(start, 4), 'duration': round(duration, 4)}
+    with _lock:
+        if _log_path is None:
+            _phases.append(entry)
+        else:
+            _write({'event': 'phase', **entry})
+
+
+@contextmanager
+def timed(phase):
+    """Record the time spent in a ``with`` block."""
+    start = now()
+    try:
+        yield
+    finally:
+        record(phase, start, now() - start)
+
+
+def first_frame(*args):
+    """Write the startup report; bind it to the window's first on_flip."""
+    global _log_path
+    if _log_path is not None:
+        return
+    from kivy.app import App
+    from kivy.core.window import Window
+    from kivy.logger import Logger
+    from kivy.utils import platform
+    Window.funbind('on_flip', first_frame)
+
+    frame = now()
+    app = App.get_running_app()
+    try:
+        folder = app.user_data_dir
+    except (AttributeError, OSError):
+        # No running app, or its data directory cannot be created
+        folder = os.getcwd()
+    with _lock:
+        _log_path = os.path.join(folder, LOG_NAME)
+        if os.path.exists(_log_path) and os.path.getsize(_log_path) > MAX_LOG_BYTES:
+            os.replace(_log_path, _log_path + '.old')
+        report = {
+            'event': 'startup',
+            'time': time.time(),
+            'platform': platform,
+            'python': sys.version.split()[0],
+            'process_age': None if _process_age is None else round(_process_age, 4),
+            'time_to_first_frame': round(frame + (_process_age or 0), 4),
+            'phases': sorted(_phases, key=lambda entry: entry['start']),
+        }
+        _write(report)
+
+    for entry in report['phases']:
+        Logger.info(f"Startup: {entry['phase']} {entry['duration'] * 1000:.1f} ms")
+    Logger.info(f"Startup: first frame after {report['time_to_first_frame']:.3f} s, report in {_log_path}")
+
+
+def _write(entry):
+    try:
+        with open(_log_path, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+    except OSError as e:
+        print(f"Could not write startup timing to {_log_path}: {e}")
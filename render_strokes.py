@@ -0,0 +1,130 @@
+from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import lru_cache
+import numpy as np
+import argparse
+import os
+
+from data_aug import ShardWriter, SHARD_SIZE, parse_size
+from pages.menu_page.seepain_info.stroke import PAIN_COLORS
+from pages.menu_page.seepain_info.stroke_aug import rasterize_strokes
+from pages.menu_page.seepain_info.stroke_io import EXTENSION, read_strokes, map_strokes, fit_frame
+
+# Folder containing the saved stroke files (.spd)
+INPUT_FOLDER = "seepain_data/Schmerzzeichnungen/"
+
+# Folder the rendered drawings are written to
+OUTPUT_FOLDER = "seepain_data/rendered/"
+
+# Body template the strokes are drawn over, as in the app
+TEMPLATE_PATH = "pages/menu_page/seepain_info/seepain_human_template.png"
+
+# Same as canvas_export.EXPORT_SIZE, so rendered files match the app's exports
+OUTPUT_SIZE = (1024, 1024)
+
+
+@lru_cache(maxsize=8)
+def load_template(path, size):
+    """Load the body template resized to ``size``, once per worker process; None if missing."""
+    if not path or not os.path.exists(path):
+        return None
+    return Image.open(path).convert("RGBA").resize(size, Image.LANCZOS)
+
+
+def stroke_color(stroke):
+    """Color of a stroke from the pain slider table, like MainLayout.set_pain_color."""
+    if 1 <= stroke.pain_level <= len(PAIN_COLORS):
+        return PAIN_COLORS[stroke.pain_level - 1]
+    return stroke.color
+
+
+def render_drawing(stroke_path, size=OUTPUT_SIZE, template_path=TEMPLATE_PATH):
+    """Render one stroke file as DrawWidget shows it: the template fitted into ``size``, strokes on top."""
+    strokes, _, frame = read_strokes(stroke_path)
+    x, y, scale = fit_frame(frame, size)
+    width, height = frame[2] * scale, frame[3] * scale
+
+    image = Image.new("RGBA", size, (255, 255, 255, 255))
+    template = load_template(template_path, (max(1, round(width)), max(1, round(height))))
+    if template is not None:
+        # PIL's y axis points down
+        image.alpha_composite(template, (round(x), round(size[1] - y - height)))
+
+    # Same mapping as DrawWidget.load_strokes: the line widths scale with the template
+    mapped = map_strokes(strokes, frame, (x, y, width, height))
+    data = [{'points': stroke.points, 'color': stroke_color(stroke), 'width': stroke.width} for stroke in mapped]
+    return rasterize_strokes(data, size, background=image)
+
+
+def list_stroke_files(folder_path):
+    """Return the stroke files of a folder, sorted so runs are reproducible."""
+    return sorted(f for f in os.listdir(folder_path) if f.lower().endswith(EXTENSION))
+
+
+def render_task(task):
+    """Render one drawing; writes a PNG, or returns the RGBA array if there is no output path."""
+    stroke_path, output_path, size, template_path = task
+    image = render_drawing(stroke_path, size, template_path)
+    if output_path is None:
+        return np.asarray(image)
+    image.save(output_path)
+    return output_path
+
+
+class RenderShardWriter(ShardWriter):
+    """ShardWriter whose index lists the stroke file each image was rendered from."""
+
+    INDEX_FIELDS = ("shard", "offset", "source")
+
+    def add(self, pixels, stroke_file):
+        return self._append(pixels, (stroke_file,))
+
+
+def run(input_folder, output_folder, size=OUTPUT_SIZE, workers=1, output_format="png", shard_size=SHARD_SIZE,
+        template_path=TEMPLATE_PATH):
+    stroke_files = list_stroke_files(input_folder)
+    os.makedirs(output_folder, exist_ok=True)
+    if template_path and not os.path.exists(template_path):
+        print(f"Template {template_path} not found, rendering on white")
+
+    def output_path(stroke_file):
+        if output_format != "png":
+            return None
+        return os.path.join(output_folder, os.path.splitext(stroke_file)[0] + ".png")
+
+    tasks = [(os.path.join(input_folder, f), output_path(f), size, template_path) for f in stroke_files]
+
+    with ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext() as executor:
+        results = executor.map(render_task, tasks) if executor else map(render_task, tasks)
+        if output_format == "png":
+            for result in results:
+                print(f"Rendered drawing saved to {result}")
+            return
+
+        with RenderShardWriter(output_folder, size, shard_size, prefix="render") as writer:
+            for stroke_file, pixels in zip(stroke_files, results):
+                print(f"Rendered drawing saved to {writer.add(pixels, stroke_file)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render saved SeePain stroke files without a window.")
+    parser.add_argument("--input", default=INPUT_FOLDER, help="folder containing the .spd stroke files")
+    parser.add_argument("--output", default=OUTPUT_FOLDER, help="folder the images are written to")
+    parser.add_argument("--size", type=parse_size, default=OUTPUT_SIZE, help="output size as WIDTHxHEIGHT")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of worker processes (0 = one per CPU core)")
+    parser.add_argument("--format", choices=("png", "npy"), default="png",
+                        help="one PNG per drawing, or uint8 array shards with an index")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE, help="images per .npy shard")
+    parser.add_argument("--template", default=TEMPLATE_PATH, help="body template drawn under the strokes")
+    parser.add_argument("--no-template", action="store_true", help="render the strokes on white")
+    args = parser.parse_args(argv)
+
+    workers = args.workers or os.cpu_count() or 1
+    run(args.input, args.output, args.size, workers, args.format, args.shard_size,
+        None if args.no_template else args.template)
+
+
+if __name__ == "__main__":
+    main()